@@ -5,9 +5,30 @@ KuaiRec is a recommendation dataset from Kuaishou (Chinese short video platform)
 We need to understand if it has A/B test data or if we need to simulate experiments.
 """
 
-import pandas as pd
+import glob
 import os
 
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+
+def read_csv_head(path, n_rows):
+    """
+    Parse only the leading blocks of a CSV with Arrow's streaming reader.
+
+    Returns a pyarrow Table of at most n_rows; use .schema for dtypes and
+    .to_pandas() only for display.
+    """
+    reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=8 * 1024 * 1024))
+    batches, n = [], 0
+    for batch in reader:
+        batches.append(batch)
+        n += batch.num_rows
+        if n >= n_rows:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, n_rows)
+
+
 print("=" * 80)
 print("ANALYZING KUAIREC DATASET")
 print("=" * 80)
@@ -20,7 +41,8 @@ print("1. USER FEATURES")
 print("=" * 80)
 
 try:
-    df_users = pd.read_csv('Data/user_features_raw.csv', nrows=1000)
+    users = read_csv_head('Data/user_features_raw.csv', 1000)
+    df_users = users.to_pandas()
     
     print(f"\nShape: {df_users.shape}")
     print(f"\nColumns ({len(df_users.columns)}):")
@@ -31,7 +53,7 @@ try:
     print(df_users.head())
     
     print(f"\nData types:")
-    print(df_users.dtypes)
+    print(users.schema)
     
     print(f"\nSample statistics:")
     print(df_users.describe())
@@ -54,7 +76,7 @@ print("2. VIDEO CATEGORIES")
 print("=" * 80)
 
 try:
-    df_videos = pd.read_csv('Data/video_raw_categories_multi.csv', nrows=1000)
+    df_videos = read_csv_head('Data/video_raw_categories_multi.csv', 1000).to_pandas()
     
     print(f"\nShape: {df_videos.shape}")
     print(f"\nColumns: {list(df_videos.columns)}")
@@ -72,7 +94,7 @@ print("3. CAPTIONS")
 print("=" * 80)
 
 try:
-    df_captions = pd.read_csv('Data/kuairec_caption_category.csv', nrows=1000)
+    df_captions = read_csv_head('Data/kuairec_caption_category.csv', 1000).to_pandas()
     
     print(f"\nShape: {df_captions.shape}")
     print(f"\nColumns: {list(df_captions.columns)}")
@@ -89,13 +111,18 @@ print("\n" + "=" * 80)
 print("4. LOOKING FOR INTERACTION/BEHAVIOR DATA")
 print("=" * 80)
 
-# Check if there are other CSV files in the Data directory
-import glob
+# Check if there are other CSV files in the Data directory; the schema comes
+# from the first Arrow block, so even large files are cheap to inspect
 csv_files = glob.glob('Data/*.csv')
 print(f"\nAll CSV files in Data/:")
 for f in csv_files:
     file_size = os.path.getsize(f) / (1024 * 1024)  # MB
     print(f"  {os.path.basename(f)}: {file_size:.2f} MB")
+    try:
+        schema = read_csv_head(f, 1).schema
+        print("    " + ", ".join(f"{field.name}: {field.type}" for field in schema))
+    except Exception as e:
+        print(f"    (could not parse: {e})")
 
 # ============================================================================
 # ANALYSIS SUMMARY
@@ -5,6 +5,13 @@ Generates comprehensive comparison plots across all datasets:
 - Synthetic (baseline)
 - Criteo (13.9M rows, real A/B tests)
 - KuaiRec (7.2K users, simulated A/B tests)
+
+Set PROXIMA_FAST_FIGS=1 while iterating to write PNGs with minimal
+compression (much faster, larger files); the default is archival quality.
+
+A figure is only re-rendered when its input CSVs (or this script) changed
+since the last run; a <figure>.png.hash sidecar records the inputs' sha256.
+Delete the sidecar to force a rebuild.
 """
 
 import sys
@@ -12,223 +19,314 @@ sys.path.append('src')
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # file output only; skip interactive backend init
 import matplotlib.pyplot as plt
-import seaborn as sns
+import hashlib
+import io
+import multiprocessing
 import os
-
-# Set publication-quality style
-plt.style.use('seaborn-v0_8-paper')
-sns.set_palette("husl")
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.labelsize'] = 11
-plt.rcParams['axes.titlesize'] = 12
-plt.rcParams['xtick.labelsize'] = 9
-plt.rcParams['ytick.labelsize'] = 9
-plt.rcParams['legend.fontsize'] = 9
-
-# Create output directory
-os.makedirs("outputs/paper_figures", exist_ok=True)
-
-print("=" * 80)
-print("CREATING PUBLICATION-QUALITY VISUALIZATIONS")
-print("=" * 80)
-
-# ============================================================================
-# LOAD ALL DATASETS
-# ============================================================================
-print("\nLoading datasets...")
-
-datasets = {}
-
-# Criteo
-if os.path.exists('outputs/criteo/proxy_scores.csv'):
-    datasets['Criteo\n(13.9M rows)'] = {
-        'proxy_scores': pd.read_csv('outputs/criteo/proxy_scores.csv'),
-        'decision_results': pd.read_csv('outputs/criteo/decision_results.csv'),
-        'fragility': pd.read_csv('outputs/criteo/fragility_segments.csv')
-    }
-    print("✓ Loaded Criteo results")
-
-# KuaiRec
-if os.path.exists('outputs/kuairec/proxy_scores.csv'):
-    datasets['KuaiRec\n(7.2K users)'] = {
-        'proxy_scores': pd.read_csv('outputs/kuairec/proxy_scores.csv'),
-        'decision_results': pd.read_csv('outputs/kuairec/decision_results.csv'),
-        'fragility': pd.read_csv('outputs/kuairec/fragility_segments.csv')
+from PIL import Image
+
+# PNG deflate dominates write time at 300 dpi: trade size for speed on demand
+FAST_FIGS = os.environ.get('PROXIMA_FAST_FIGS') == '1'
+
+
+def save_png(fig, path):
+    """Render fig to PNG in memory and write it with Pillow's encoder."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    buf.seek(0)
+    with Image.open(buf) as img:
+        if FAST_FIGS:
+            img.save(path, format='PNG', optimize=False, compress_level=1, dpi=img.info.get('dpi'))
+        else:
+            img.save(path, format='PNG', optimize=True, compress_level=9, dpi=img.info.get('dpi'))
+
+
+def _inputs_hash(paths):
+    """sha256 over the input files, this script and the PNG mode."""
+    h = hashlib.sha256()
+    for path in [*paths, __file__]:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    h.update(b'fast' if FAST_FIGS else b'archival')
+    return h.hexdigest()
+
+
+def _needs_rebuild(out_png, key):
+    """True unless out_png exists and its sidecar hash matches key."""
+    sidecar = out_png + '.hash'
+    if not (os.path.exists(out_png) and os.path.exists(sidecar)):
+        return True
+    with open(sidecar) as f:
+        return f.read() != key
+
+
+def _write_hash(out_png, key):
+    with open(out_png + '.hash', 'w') as f:
+        f.write(key)
+
+
+def _init_style():
+    """Set publication-quality style (seaborn pulls in scipy, so import it here)."""
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8-paper')
+    sns.set_palette("husl")
+    plt.rcParams['figure.dpi'] = 300
+    plt.rcParams['savefig.dpi'] = 300
+    plt.rcParams['font.size'] = 10
+    plt.rcParams['axes.labelsize'] = 11
+    plt.rcParams['axes.titlesize'] = 12
+    plt.rcParams['xtick.labelsize'] = 9
+    plt.rcParams['ytick.labelsize'] = 9
+    plt.rcParams['legend.fontsize'] = 9
+
+
+# (display name, results directory) for every dataset the paper compares
+DATASET_SPECS = [
+    ('Criteo\n(13.9M rows)', 'outputs/criteo'),
+    ('KuaiRec\n(7.2K users)', 'outputs/kuairec'),
+]
+
+FIGURE1_PNG = 'outputs/paper_figures/figure1_proxy_reliability.png'
+FIGURE2_PNG = 'outputs/paper_figures/figure2_decision_simulation.png'
+
+
+def _load_dataset(spec):
+    """Read one dataset's result tables (runs in a worker process)."""
+    name, results_dir = spec
+    return name, {
+        'proxy_scores': pd.read_csv(os.path.join(results_dir, 'proxy_scores.csv')),
+        'decision_results': pd.read_csv(os.path.join(results_dir, 'decision_results.csv')),
+        'fragility': pd.read_csv(os.path.join(results_dir, 'fragility_segments.csv'))
     }
-    print("✓ Loaded KuaiRec results")
-
-if not datasets:
-    print("ERROR: No datasets found!")
-    sys.exit(1)
-
-# ============================================================================
-# FIGURE 1: PROXY RELIABILITY COMPARISON
-# ============================================================================
-print("\nCreating Figure 1: Proxy Reliability Comparison...")
-
-fig, axes = plt.subplots(1, 2, figsize=(12, 4))
-
-# Panel A: Reliability scores
-ax = axes[0]
-data_for_plot = []
-for dataset_name, data in datasets.items():
-    df = data['proxy_scores'].copy()
-    df['dataset'] = dataset_name
-    data_for_plot.append(df)
-
-combined = pd.concat(data_for_plot, ignore_index=True)
-
-# Create grouped bar chart
-metrics = combined['metric'].unique()
-x = np.arange(len(metrics))
-width = 0.35
-dataset_names = list(datasets.keys())
-
-for i, dataset_name in enumerate(dataset_names):
-    subset = combined[combined['dataset'] == dataset_name]
-    subset = subset.set_index('metric').reindex(metrics)
-    ax.bar(x + i*width, subset['reliability'], width, label=dataset_name, alpha=0.8)
-
-ax.set_xlabel('Proxy Metric')
-ax.set_ylabel('Reliability Score')
-ax.set_title('(A) Proxy Reliability Across Datasets')
-ax.set_xticks(x + width/2)
-ax.set_xticklabels([m.replace('_', '\n') for m in metrics], rotation=0, ha='center')
-ax.legend()
-ax.grid(axis='y', alpha=0.3)
-ax.set_ylim(0, 1.0)
-
-# Panel B: Correlation vs Directional Accuracy
-ax = axes[1]
-for dataset_name, data in datasets.items():
-    df = data['proxy_scores']
-    ax.scatter(df['effect_corr'], df['directional_accuracy'], 
-              s=100, alpha=0.7, label=dataset_name)
-    
-    # Add metric labels
-    for _, row in df.iterrows():
-        ax.annotate(row['metric'].replace('_', '\n'), 
-                   (row['effect_corr'], row['directional_accuracy']),
-                   fontsize=7, alpha=0.6, ha='center')
-
-ax.set_xlabel('Effect Correlation')
-ax.set_ylabel('Directional Accuracy')
-ax.set_title('(B) Correlation vs Directional Accuracy')
-ax.legend()
-ax.grid(alpha=0.3)
-ax.set_xlim(-1, 1)
-ax.set_ylim(0, 1)
-
-plt.tight_layout()
-plt.savefig('outputs/paper_figures/figure1_proxy_reliability.png', bbox_inches='tight')
-print("✓ Saved: outputs/paper_figures/figure1_proxy_reliability.png")
-plt.close()
-
-# ============================================================================
-# FIGURE 2: DECISION SIMULATION RESULTS
-# ============================================================================
-print("\nCreating Figure 2: Decision Simulation Results...")
-
-fig, axes = plt.subplots(1, 2, figsize=(12, 4))
-
-# Panel A: Win Rate Comparison
-ax = axes[0]
-data_for_plot = []
-for dataset_name, data in datasets.items():
-    df = data['decision_results'].copy()
-    df = df[df['proxy_metric'] != 'Oracle (True Long-term)']  # Exclude oracle
-    df['dataset'] = dataset_name
-    data_for_plot.append(df)
-
-combined = pd.concat(data_for_plot, ignore_index=True)
-
-# Create grouped bar chart
-metrics = combined['proxy_metric'].unique()
-x = np.arange(len(metrics))
-width = 0.35
-
-for i, dataset_name in enumerate(dataset_names):
-    subset = combined[combined['dataset'] == dataset_name]
-    subset = subset.set_index('proxy_metric').reindex(metrics)
-    ax.bar(x + i*width, subset['win_rate'], width, label=dataset_name, alpha=0.8)
-
-ax.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='Oracle')
-ax.set_xlabel('Proxy Metric')
-ax.set_ylabel('Win Rate')
-ax.set_title('(A) Decision Win Rate by Proxy')
-ax.set_xticks(x + width/2)
-ax.set_xticklabels([m.replace('_', '\n') for m in metrics], rotation=0, ha='center')
-ax.legend()
-ax.grid(axis='y', alpha=0.3)
-ax.set_ylim(0, 1.1)
-
-# Panel B: Error Rates
-ax = axes[1]
-for dataset_name, data in datasets.items():
-    df = data['decision_results']
-    df = df[df['proxy_metric'] != 'Oracle (True Long-term)']
-    
-    # Plot false positive and false negative rates
-    x_pos = np.arange(len(df))
-    ax.scatter(df['false_positive_rate'], df['false_negative_rate'],
-              s=150, alpha=0.7, label=dataset_name)
-
-ax.set_xlabel('False Positive Rate')
-ax.set_ylabel('False Negative Rate')
-ax.set_title('(B) Error Rate Trade-offs')
-ax.legend()
-ax.grid(alpha=0.3)
-ax.set_xlim(-0.05, 1.05)
-ax.set_ylim(-0.05, 1.05)
-
-# Add diagonal line (equal error rate)
-ax.plot([0, 1], [0, 1], 'k--', alpha=0.3, label='Equal Error')
-
-plt.tight_layout()
-plt.savefig('outputs/paper_figures/figure2_decision_simulation.png', bbox_inches='tight')
-print("✓ Saved: outputs/paper_figures/figure2_decision_simulation.png")
-plt.close()
-
-# ============================================================================
-# SUMMARY TABLE
-# ============================================================================
-print("\nCreating summary table...")
-
-summary_rows = []
-for dataset_name, data in datasets.items():
-    proxy_scores = data['proxy_scores']
-    decision_results = data['decision_results']
-    
-    # Best proxy
-    best_proxy = proxy_scores.iloc[0]
-    best_decision = decision_results[decision_results['proxy_metric'] == best_proxy['metric']].iloc[0]
-    
-    summary_rows.append({
-        'Dataset': dataset_name.replace('\n', ' '),
-        'Best Proxy': best_proxy['metric'],
-        'Reliability': f"{best_proxy['reliability']:.3f}",
-        'Correlation': f"{best_proxy['effect_corr']:.3f}",
-        'Dir. Accuracy': f"{best_proxy['directional_accuracy']:.3f}",
-        'Win Rate': f"{best_decision['win_rate']:.3f}",
-        'FP Rate': f"{best_decision['false_positive_rate']:.3f}",
-        'FN Rate': f"{best_decision['false_negative_rate']:.3f}"
-    })
-
-summary_df = pd.DataFrame(summary_rows)
-summary_df.to_csv('outputs/paper_figures/summary_table.csv', index=False)
-print("\n" + "=" * 80)
-print("SUMMARY TABLE")
-print("=" * 80)
-print(summary_df.to_string(index=False))
-print("\n✓ Saved: outputs/paper_figures/summary_table.csv")
-
-print("\n" + "=" * 80)
-print("✓ ALL VISUALIZATIONS COMPLETE!")
-print("=" * 80)
-print(f"""
+
+
+def load_datasets():
+    """Load per-dataset result tables written by the integration scripts."""
+    print("\nLoading datasets...")
+
+    specs = [
+        spec for spec in DATASET_SPECS
+        if os.path.exists(os.path.join(spec[1], 'proxy_scores.csv'))
+    ]
+    if not specs:
+        return {}
+
+    # Datasets are independent, so read them in parallel; plotting stays in
+    # the main process
+    with multiprocessing.Pool(len(specs)) as pool:
+        datasets = dict(pool.map(_load_dataset, specs))
+
+    for name in datasets:
+        label = name.split('\n')[0]
+        print(f"✓ Loaded {label} results")
+
+    return datasets
+
+
+def pivot_by_dataset(datasets, table, metric_col, value_col, exclude=()):
+    """
+    Stack one result table across datasets and pivot it to metric x dataset.
+
+    Rows keep first-seen metric order and columns follow datasets, so the
+    plotting loops index straight into the pivot without any reindexing.
+    """
+    frames = []
+    for dataset_name, data in datasets.items():
+        df = data[table]
+        df = df.loc[~df[metric_col].isin(exclude), [metric_col, value_col]]
+        frames.append(df.assign(dataset=dataset_name))
+    combined = pd.concat(frames, ignore_index=True)
+
+    metrics = list(combined[metric_col].drop_duplicates())
+    pivot = combined.pivot_table(index=metric_col, columns='dataset', values=value_col)
+    return pivot.reindex(index=metrics, columns=list(datasets))
+
+
+def create_figure1(fig, datasets, dataset_names, pivot):
+    """Figure 1: proxy reliability comparison."""
+    print("\nCreating Figure 1: Proxy Reliability Comparison...")
+
+    fig.clf()
+    axes = fig.subplots(1, 2)
+
+    # Panel A: Reliability scores (grouped bar chart)
+    ax = axes[0]
+    metrics = pivot.index
+    x = np.arange(len(metrics))
+    width = 0.35
+
+    for i, dataset_name in enumerate(dataset_names):
+        ax.bar(x + i*width, pivot[dataset_name].to_numpy(), width, label=dataset_name, alpha=0.8)
+
+    ax.set_xlabel('Proxy Metric')
+    ax.set_ylabel('Reliability Score')
+    ax.set_title('(A) Proxy Reliability Across Datasets')
+    ax.set_xticks(x + width/2)
+    ax.set_xticklabels([m.replace('_', '\n') for m in metrics], rotation=0, ha='center')
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+    ax.set_ylim(0, 1.0)
+
+    # Panel B: Correlation vs Directional Accuracy
+    ax = axes[1]
+    for dataset_name, data in datasets.items():
+        df = data['proxy_scores']
+        ax.scatter(df['effect_corr'], df['directional_accuracy'], 
+                  s=100, alpha=0.7, label=dataset_name)
+
+        # Add metric labels (plain arrays; iterrows() would box every row)
+        labels = [m.replace('_', '\n') for m in df['metric'].to_numpy()]
+        for label, x, y in zip(labels, df['effect_corr'].to_numpy(), df['directional_accuracy'].to_numpy()):
+            ax.annotate(label, (x, y), fontsize=7, alpha=0.6, ha='center')
+
+    ax.set_xlabel('Effect Correlation')
+    ax.set_ylabel('Directional Accuracy')
+    ax.set_title('(B) Correlation vs Directional Accuracy')
+    ax.legend()
+    ax.grid(alpha=0.3)
+    ax.set_xlim(-1, 1)
+    ax.set_ylim(0, 1)
+
+    save_png(fig, FIGURE1_PNG)
+    print(f"✓ Saved: {FIGURE1_PNG}")
+
+
+def create_figure2(fig, datasets, dataset_names, pivot):
+    """Figure 2: decision simulation results."""
+    print("\nCreating Figure 2: Decision Simulation Results...")
+
+    fig.clf()
+    axes = fig.subplots(1, 2)
+
+    # Panel A: Win Rate Comparison (grouped bar chart, oracle excluded)
+    ax = axes[0]
+    metrics = pivot.index
+    x = np.arange(len(metrics))
+    width = 0.35
+
+    for i, dataset_name in enumerate(dataset_names):
+        ax.bar(x + i*width, pivot[dataset_name].to_numpy(), width, label=dataset_name, alpha=0.8)
+
+    ax.axhline(y=1.0, color='red', linestyle='--', alpha=0.5, label='Oracle')
+    ax.set_xlabel('Proxy Metric')
+    ax.set_ylabel('Win Rate')
+    ax.set_title('(A) Decision Win Rate by Proxy')
+    ax.set_xticks(x + width/2)
+    ax.set_xticklabels([m.replace('_', '\n') for m in metrics], rotation=0, ha='center')
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+    ax.set_ylim(0, 1.1)
+
+    # Panel B: Error Rates
+    ax = axes[1]
+    for dataset_name, data in datasets.items():
+        df = data['decision_results']
+        df = df[df['proxy_metric'] != 'Oracle (True Long-term)']
+
+        # Plot false positive and false negative rates
+        x_pos = np.arange(len(df))
+        ax.scatter(df['false_positive_rate'], df['false_negative_rate'],
+                  s=150, alpha=0.7, label=dataset_name)
+
+    ax.set_xlabel('False Positive Rate')
+    ax.set_ylabel('False Negative Rate')
+    ax.set_title('(B) Error Rate Trade-offs')
+    ax.legend()
+    ax.grid(alpha=0.3)
+    ax.set_xlim(-0.05, 1.05)
+    ax.set_ylim(-0.05, 1.05)
+
+    # Add diagonal line (equal error rate)
+    ax.plot([0, 1], [0, 1], 'k--', alpha=0.3, label='Equal Error')
+
+    save_png(fig, FIGURE2_PNG)
+    print(f"✓ Saved: {FIGURE2_PNG}")
+
+
+def create_summary_table(datasets):
+    """Best-proxy summary table across datasets."""
+    print("\nCreating summary table...")
+
+    summary_rows = []
+    for dataset_name, data in datasets.items():
+        proxy_scores = data['proxy_scores']
+        decision_results = data['decision_results']
+
+        # Best proxy
+        best_proxy = proxy_scores.iloc[0]
+        best_decision = decision_results[decision_results['proxy_metric'] == best_proxy['metric']].iloc[0]
+
+        summary_rows.append({
+            'Dataset': dataset_name.replace('\n', ' '),
+            'Best Proxy': best_proxy['metric'],
+            'Reliability': best_proxy['reliability'],
+            'Correlation': best_proxy['effect_corr'],
+            'Dir. Accuracy': best_proxy['directional_accuracy'],
+            'Win Rate': best_decision['win_rate'],
+            'FP Rate': best_decision['false_positive_rate'],
+            'FN Rate': best_decision['false_negative_rate'],
+        })
+
+    # Values stay numeric; the writers apply the 3-decimal format
+    summary_df = pd.DataFrame(summary_rows)
+    summary_df.to_csv('outputs/paper_figures/summary_table.csv', index=False, float_format='%.3f')
+    print("\n" + "=" * 80)
+    print("SUMMARY TABLE")
+    print("=" * 80)
+    print(summary_df.to_string(index=False, float_format='{:.3f}'.format))
+    print("\n✓ Saved: outputs/paper_figures/summary_table.csv")
+
+
+def main():
+    _init_style()
+
+    # Create output directory
+    os.makedirs("outputs/paper_figures", exist_ok=True)
+
+    print("=" * 80)
+    print("CREATING PUBLICATION-QUALITY VISUALIZATIONS")
+    print("=" * 80)
+
+    datasets = load_datasets()
+    if not datasets:
+        print("ERROR: No datasets found!")
+        sys.exit(1)
+
+    # Dataset and metric order are fixed once and shared by both figures
+    dataset_names = list(datasets)
+    reliability = pivot_by_dataset(datasets, 'proxy_scores', 'metric', 'reliability')
+    win_rate = pivot_by_dataset(
+        datasets, 'decision_results', 'proxy_metric', 'win_rate',
+        exclude=('Oracle (True Long-term)',)
+    )
+
+    # Both figures share one size, so a single constrained-layout Figure is
+    # created once and cleared between them
+    fig = plt.figure(figsize=(12, 4), layout='constrained')
+    loaded_dirs = [results_dir for name, results_dir in DATASET_SPECS if name in datasets]
+    figures = [
+        (FIGURE1_PNG, 'proxy_scores', create_figure1, reliability),
+        (FIGURE2_PNG, 'decision_results', create_figure2, win_rate),
+    ]
+    for out_png, table, create_figure, pivot in figures:
+        key = _inputs_hash([os.path.join(d, f'{table}.csv') for d in loaded_dirs])
+        if not _needs_rebuild(out_png, key):
+            print(f"\n✓ Up to date (inputs unchanged): {out_png}")
+            continue
+        create_figure(fig, datasets, dataset_names, pivot)
+        _write_hash(out_png, key)
+    plt.close(fig)
+
+    create_summary_table(datasets)
+
+    print("\n" + "=" * 80)
+    print("✓ ALL VISUALIZATIONS COMPLETE!")
+    print("=" * 80)
+    print(f"""
 Publication-ready figures saved to outputs/paper_figures/:
   - figure1_proxy_reliability.png
   - figure2_decision_simulation.png
@@ -237,3 +335,6 @@ Publication-ready figures saved to outputs/paper_figures/:
 These are ready for inclusion in your research paper!
 """)
 
+
+if __name__ == "__main__":
+    main()
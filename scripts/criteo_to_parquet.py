@@ -0,0 +1,80 @@
+"""
+Convert the Criteo Uplift CSV to Parquet (one-time step)
+
+Parsing the 13.9M-row gzipped CSV dominates every run of the Criteo
+integration scripts. This converts it once to a zstd-compressed Parquet file
+with compact dtypes so later runs can read only the columns they need.
+
+Run with: python scripts/criteo_to_parquet.py
+Requires: pyarrow (rapidgzip optional, for multi-threaded decompression)
+"""
+
+import argparse
+import os
+import sys
+sys.path.append('src')
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from proxima._gzip import gzip_source
+
+CRITEO_CSV = 'Data/criteo-uplift-v2.1.csv.gz'
+CRITEO_PARQUET = 'Data/criteo.parquet'
+
+# Binary flags fit in int8; features keep float32 precision
+CRITEO_COLUMN_TYPES = {
+    **{f'f{i}': pa.float32() for i in range(12)},
+    'treatment': pa.int8(),
+    'conversion': pa.int8(),
+    'visit': pa.int8(),
+    'exposure': pa.int8(),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Criteo Uplift CSV to Parquet")
+    parser.add_argument("--input", type=str, default=CRITEO_CSV, help="Gzipped Criteo CSV")
+    parser.add_argument("--output", type=str, default=CRITEO_PARQUET, help="Parquet output path")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="Approximate rows per row group")
+    parser.add_argument("--block-size", type=int, default=32, help="CSV read block size in MB")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("CONVERTING CRITEO CSV TO PARQUET")
+    print("=" * 80)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    # Stream Arrow record batches straight into the Parquet writer: only about
+    # one row group is buffered, and the reader decompresses/parses the next
+    # blocks in the background while the current one is encoded
+    n_rows = 0
+    with gzip_source(args.input) as source:
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(block_size=args.block_size << 20, use_threads=True),
+            convert_options=pacsv.ConvertOptions(column_types=CRITEO_COLUMN_TYPES),
+        )
+        with pq.ParquetWriter(args.output, reader.schema, compression='zstd') as writer:
+            pending = []
+            n_pending = 0
+            for batch in reader:
+                pending.append(batch)
+                n_pending += batch.num_rows
+                if n_pending >= args.chunk_size:
+                    writer.write_table(pa.Table.from_batches(pending), row_group_size=n_pending)
+                    n_rows += n_pending
+                    pending, n_pending = [], 0
+                    print(f"  ... {n_rows:,} rows")
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=n_pending)
+                n_rows += n_pending
+
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"\n✓ Wrote {n_rows:,} rows to {args.output} ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,29 @@
 Explore and prepare real datasets for PROXIMA
 """
 
-import pandas as pd
-import numpy as np
-import gzip
 import os
 
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+
+def read_csv_head(path, n_rows):
+    """
+    Parse only the leading blocks of a CSV with Arrow's streaming reader.
+
+    Returns a pyarrow Table of at most n_rows; use .schema for dtypes and
+    .to_pandas() only for display.
+    """
+    reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=8 * 1024 * 1024))
+    batches, n = [], 0
+    for batch in reader:
+        batches.append(batch)
+        n += batch.num_rows
+        if n >= n_rows:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, n_rows)
+
+
 print("=" * 80)
 print("EXPLORING REAL DATASETS FOR PROXIMA")
 print("=" * 80)
@@ -22,30 +40,28 @@ print("1. CRITEO UPLIFT DATASET")
 print("=" * 80)
 
 try:
-    # Extract gzip file
-    print("Extracting Criteo dataset...")
-    with gzip.open('Data/criteo-uplift-v2.1.csv.gz', 'rb') as f_in:
-        with open('Data/criteo-uplift-v2.1.csv', 'wb') as f_out:
-            f_out.write(f_in.read())
-    
-    # Load dataset
+    # Load dataset straight from the gzip archive (decompressed on the fly,
+    # no intermediate CSV on disk)
     print("Loading Criteo dataset...")
-    criteo = pd.read_csv('Data/criteo-uplift-v2.1.csv', nrows=100000)  # Load first 100k for exploration
+    criteo_table = read_csv_head('Data/criteo-uplift-v2.1.csv.gz', 100000)  # First 100k for exploration
+    criteo = criteo_table.to_pandas()
     
     print(f"\nShape: {criteo.shape}")
     print(f"\nColumns: {list(criteo.columns)}")
     print(f"\nFirst few rows:")
     print(criteo.head())
     print(f"\nData types:")
-    print(criteo.dtypes)
-    print(f"\nMissing values:")
-    print(criteo.isnull().sum())
+    print(criteo_table.schema)
+    # One summary pass instead of separate describe()/isnull() scans;
+    # missing values are len(criteo) - count
+    print(f"\nSummary (count / mean / std / min / max):")
+    print(criteo.agg(['count', 'mean', 'std', 'min', 'max']).T)
     
     # Check for treatment and outcome columns
     print(f"\nUnique values in key columns:")
-    for col in criteo.columns:
-        if criteo[col].nunique() < 20:
-            print(f"  {col}: {criteo[col].unique()}")
+    nunique = criteo.nunique()
+    for col in nunique.index[nunique < 20]:
+        print(f"  {col}: {criteo[col].unique()}")
     
 except Exception as e:
     print(f"Error loading Criteo dataset: {e}")
@@ -59,7 +75,7 @@ print("=" * 80)
 
 try:
     print("Loading KuaiRec user features...")
-    kuairec_users = pd.read_csv('Data/user_features_raw.csv', nrows=10000)
+    kuairec_users = read_csv_head('Data/user_features_raw.csv', 10000).to_pandas()
     
     print(f"\nShape: {kuairec_users.shape}")
     print(f"\nColumns: {list(kuairec_users.columns)}")
@@ -67,7 +83,7 @@ try:
     print(kuairec_users.head())
     
     print("\nLoading KuaiRec video categories...")
-    kuairec_videos = pd.read_csv('Data/video_raw_categories_multi.csv', nrows=10000)
+    kuairec_videos = read_csv_head('Data/video_raw_categories_multi.csv', 10000).to_pandas()
     
     print(f"\nShape: {kuairec_videos.shape}")
     print(f"\nColumns: {list(kuairec_videos.columns)}")
@@ -75,7 +91,7 @@ try:
     print(kuairec_videos.head())
     
     print("\nLoading KuaiRec captions...")
-    kuairec_captions = pd.read_csv('Data/kuairec_caption_category.csv', nrows=10000)
+    kuairec_captions = read_csv_head('Data/kuairec_caption_category.csv', 10000).to_pandas()
     
     print(f"\nShape: {kuairec_captions.shape}")
     print(f"\nColumns: {list(kuairec_captions.columns)}")
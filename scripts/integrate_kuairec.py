@@ -11,9 +11,20 @@ Since KuaiRec doesn't have A/B test data, we'll simulate experiments:
 import sys
 sys.path.append('src')
 
+import argparse
 import pandas as pd
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+parser = argparse.ArgumentParser(description="Integrate KuaiRec dataset with PROXIMA")
+parser.add_argument(
+    "--quiet",
+    action="store_true",
+    help="Skip the row previews and summary tables printed while preparing the data",
+)
+args = parser.parse_args()
+
 
 print("=" * 80)
 print("INTEGRATING KUAIREC DATASET WITH PROXIMA")
@@ -22,12 +33,44 @@ print("=" * 80)
 # Create output directories
 os.makedirs("outputs/kuairec", exist_ok=True)
 
+# Output files are written on a small thread pool so serialization overlaps
+# the analysis (pandas/pyarrow release the GIL while encoding and writing)
+writer = ThreadPoolExecutor(max_workers=3)
+pending_writes = []
+
+
+def write_async(write, *args, **kwargs):
+    """Queue a DataFrame writer call (to_csv / to_parquet) on the output pool."""
+    pending_writes.append(writer.submit(write, *args, **kwargs))
+
+
+def category_effect(column, effects, default=0.0):
+    """
+    Per-row float32 effect for a categorical column via a lookup table.
+
+    The table is built once over the (few) categories and gathered with the
+    category codes; code -1 (missing) picks the trailing ``default``.
+    """
+    lut = np.array(
+        [effects.get(c, default) for c in column.cat.categories] + [default],
+        dtype=np.float32,
+    )
+    return lut[column.cat.codes.to_numpy()]
+
+
 # ============================================================================
 # STEP 1: LOAD DATA
 # ============================================================================
 print("\nSTEP 1: Loading KuaiRec data...")
 
-df_users = pd.read_csv('Data/user_features_raw.csv')
+# Only the attributes used below are parsed; the raw file also carries
+# activity counters and one-hot feature columns
+USER_COLUMNS = ['gender', 'age_range', 'platform', 'fre_city_level']
+df_users = pd.read_csv(
+    'Data/user_features_raw.csv',
+    usecols=USER_COLUMNS,
+    dtype={'age_range': 'category', 'gender': 'category', 'platform': 'category'},
+)
 print(f"✓ Loaded {len(df_users):,} users")
 
 # ============================================================================
@@ -35,15 +78,18 @@ print(f"✓ Loaded {len(df_users):,} users")
 # ============================================================================
 print("\nSTEP 2: Simulating A/B test experiments...")
 
+# One PCG64 Generator drives every draw in STEP 2 and STEP 3
+rng = np.random.default_rng(42)
+n_users = len(df_users)
+
 # Create 30 synthetic experiments
-np.random.seed(42)
 n_experiments = 30
 
 # Assign users to experiments (random assignment)
-df_users['exp_id'] = np.random.randint(0, n_experiments, size=len(df_users))
+df_users['exp_id'] = rng.integers(0, n_experiments, size=n_users, dtype=np.int16)
 
 # Random treatment assignment (50/50 split)
-df_users['treatment'] = np.random.binomial(1, 0.5, size=len(df_users))
+df_users['treatment'] = rng.binomial(1, 0.5, size=n_users).astype(np.int8)
 
 print(f"✓ Created {n_experiments} experiments")
 print(f"  Avg users per experiment: {len(df_users) // n_experiments:,}")
@@ -56,35 +102,33 @@ print("\nSTEP 3: Simulating engagement metrics...")
 # Base engagement rates (vary by user characteristics)
 base_engagement = 0.3  # 30% base engagement
 
-# User characteristics affect engagement
-gender_effect = (df_users['gender'] == 'F').astype(float) * 0.05
-age_effect = df_users['age_range'].map({
-    '12-17': 0.10,
-    '18-23': 0.08,
-    '24-30': 0.05,
-    '31-40': 0.03,
-    '50+': 0.01
-}).fillna(0.05)
+# User-attribute effects; missing or unlisted ages get the middle value
+AGE_EFFECTS = {'12-17': 0.10, '18-23': 0.08, '24-30': 0.05, '31-40': 0.03, '50+': 0.01}
 
-platform_effect = (df_users['platform'] == 'IPHONE').astype(float) * 0.08
+# Accumulate every effect into one float32 buffer instead of summing
+# full-length float64 Series
+engagement_prob = category_effect(df_users['age_range'], AGE_EFFECTS, default=0.05)
+engagement_prob += np.float32(base_engagement)
+engagement_prob += category_effect(df_users['gender'], {'F': 0.05})
+engagement_prob += category_effect(df_users['platform'], {'IPHONE': 0.08})
 
 # Treatment effect (personalization improves engagement)
-treatment_effect = df_users['treatment'] * 0.12
+engagement_prob += df_users['treatment'].to_numpy() * np.float32(0.12)
 
-# Combine effects
-engagement_prob = base_engagement + gender_effect + age_effect + platform_effect + treatment_effect
-engagement_prob = np.clip(engagement_prob, 0, 1)
+np.clip(engagement_prob, 0, 1, out=engagement_prob)
 
 # Simulate metrics
 # Early metrics (proxy - first 10 seconds)
-df_users['early_click'] = np.random.binomial(1, engagement_prob * 0.8)
-df_users['early_watch_sec'] = df_users['early_click'] * np.random.exponential(5, size=len(df_users))
-df_users['early_like'] = df_users['early_click'] * np.random.binomial(1, 0.3, size=len(df_users))
+early_click = rng.binomial(1, engagement_prob * 0.8).astype(np.int8)
+df_users['early_click'] = early_click
+df_users['early_watch_sec'] = early_click * (rng.standard_exponential(n_users, dtype=np.float32) * np.float32(5))
+df_users['early_like'] = early_click * rng.binomial(1, 0.3, size=n_users).astype(np.int8)
 
 # Long-term metrics (outcome - full session)
-long_engagement_prob = engagement_prob * 0.6  # Lower conversion to long-term
-df_users['long_watch_min'] = np.random.exponential(2, size=len(df_users)) * long_engagement_prob * 10
-df_users['long_retained'] = (df_users['long_watch_min'] > 5).astype(int)  # Retained if watched >5 min
+long_engagement_prob = engagement_prob * np.float32(0.6)  # Lower conversion to long-term
+long_watch_min = rng.standard_exponential(n_users, dtype=np.float32) * np.float32(2) * long_engagement_prob * np.float32(10)
+df_users['long_watch_min'] = long_watch_min
+df_users['long_retained'] = (long_watch_min > 5).astype(np.int8)  # Retained if watched >5 min
 
 print(f"✓ Simulated engagement metrics")
 print(f"  Early click rate: {df_users['early_click'].mean():.2%}")
@@ -95,6 +139,12 @@ print(f"  Long-term retention: {df_users['long_retained'].mean():.2%}")
 # ============================================================================
 print("\nSTEP 4: Mapping to PROXIMA format...")
 
+# Each source column is extracted once as float32 and shared; the derived
+# metrics are single float32 expressions (no astype copies or float64
+# temporaries). Columns are not mutated downstream, so sharing is safe.
+click = df_users['early_click'].to_numpy(np.float32)
+watch_min = df_users['early_watch_sec'].to_numpy(np.float32) / np.float32(60)
+
 df_proxima = pd.DataFrame({
     'exp_id': df_users['exp_id'],
     'treatment': df_users['treatment'],
@@ -105,22 +155,30 @@ df_proxima = pd.DataFrame({
     'tenure': df_users['age_range'],
     
     # Proxy metrics (early engagement)
-    'early_watch_min': df_users['early_watch_sec'] / 60,  # Convert to minutes
-    'early_starts': df_users['early_click'].astype(float),
-    'early_ctr': df_users['early_click'].astype(float),
-    'rebuffer_rate': 1 - df_users['early_click'].astype(float),  # Inverse of click
+    'early_watch_min': watch_min,  # Convert to minutes
+    'early_starts': click,
+    'early_ctr': click,
+    'rebuffer_rate': np.float32(1) - click,  # Inverse of click
     
     # Long-term outcome
-    'long_retained': df_users['long_retained']
-})
+    'long_retained': df_users['long_retained'].to_numpy()
+}, copy=False)
 
 print(f"✓ Created PROXIMA dataframe: {df_proxima.shape}")
-print(f"\nFirst few rows:")
-print(df_proxima.head())
-
-# Save
-df_proxima.to_csv('outputs/kuairec/kuairec_proxima_format.csv', index=False)
-print(f"\n✓ Saved to outputs/kuairec/kuairec_proxima_format.csv")
+if not args.quiet:
+    print(f"\nFirst few rows:")
+    print(df_proxima.head())
+
+# Save as typed, columnar Parquet; region mixes city levels with 'UNKNOWN',
+# so it is stored as text. A small CSV head is kept for spot checks.
+write_async(
+    df_proxima.astype({'region': str}).to_parquet,
+    'outputs/kuairec/kuairec_proxima_format.parquet', engine='pyarrow', compression='zstd',
+    use_dictionary=True
+)
+write_async(df_proxima.head(1_000).to_csv, 'outputs/kuairec/kuairec_proxima_format_head.csv', index=False)
+print(f"\n✓ Writing outputs/kuairec/kuairec_proxima_format.parquet in the background")
+print(f"✓ Writing first 1,000 rows to outputs/kuairec/kuairec_proxima_format_head.csv")
 
 # ============================================================================
 # STEP 5: BASIC STATISTICS
@@ -137,11 +195,12 @@ print(f"  Retention rate: {df_proxima['long_retained'].mean():.2%}")
 print(f"  Early starts rate: {df_proxima['early_starts'].mean():.2%}")
 
 print(f"\nTreatment effect (simple):")
-control = df_proxima[df_proxima['treatment'] == 0]
-treatment = df_proxima[df_proxima['treatment'] == 1]
+# One pass over the treatment column for both metrics (no masked copies)
+from proxima.models.baseline import compute_overall_effect
+effect = compute_overall_effect(df_proxima, ['long_retained', 'early_starts'])['effect']
 
-print(f"  Retention: {treatment['long_retained'].mean() - control['long_retained'].mean():.4f}")
-print(f"  Early starts: {treatment['early_starts'].mean() - control['early_starts'].mean():.4f}")
+print(f"  Retention: {effect['long_retained']:.4f}")
+print(f"  Early starts: {effect['early_starts']:.4f}")
 
 # ============================================================================
 # STEP 6: RUN PROXIMA ANALYSIS
@@ -163,7 +222,7 @@ try:
     print("PROXY RELIABILITY SCORES")
     print("=" * 80)
     print(details.to_string(index=False))
-    details.to_csv('outputs/kuairec/proxy_scores.csv', index=False)
+    write_async(details.to_csv, 'outputs/kuairec/proxy_scores.csv', index=False)
     
     print("\nDetecting fragile segments...")
     top_proxy = proxy_scores[0].metric
@@ -173,7 +232,7 @@ try:
     print(f"FRAGILE SEGMENTS FOR {top_proxy}")
     print("=" * 80)
     print(fragile_segments.head(10).to_string(index=False))
-    fragile_segments.to_csv('outputs/kuairec/fragility_segments.csv', index=False)
+    write_async(fragile_segments.to_csv, 'outputs/kuairec/fragility_segments.csv', index=False)
     
     print("\nSimulating shipping decisions...")
     decision_results = compare_decision_strategies(df_proxima, PROXY_METRICS)
@@ -182,14 +241,19 @@ try:
     print("DECISION SIMULATION RESULTS")
     print("=" * 80)
     print(decision_results.to_string(index=False))
-    decision_results.to_csv('outputs/kuairec/decision_results.csv', index=False)
+    write_async(decision_results.to_csv, 'outputs/kuairec/decision_results.csv', index=False)
     
+    # Wait for queued output files; result() re-raises any write error
+    for future in pending_writes:
+        future.result()
+    writer.shutdown()
+
     print("\n" + "=" * 80)
     print("✓ ANALYSIS COMPLETE!")
     print("=" * 80)
     print(f"""
 Results saved to:
-  - outputs/kuairec/kuairec_proxima_format.csv ({len(df_proxima):,} rows)
+  - outputs/kuairec/kuairec_proxima_format.parquet ({len(df_proxima):,} rows)
   - outputs/kuairec/proxy_scores.csv
   - outputs/kuairec/fragility_segments.csv
   - outputs/kuairec/decision_results.csv
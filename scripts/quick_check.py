@@ -1,10 +1,45 @@
 """
 Quick check of dataset structure without heavy dependencies
+
+Uses pyarrow's streaming CSV reader when installed (typed schema, one block
+parsed), otherwise the stdlib csv module.
 """
 
 import gzip
 import csv
 
+try:
+    import pyarrow.csv as pacsv
+except ImportError:  # fall back to the stdlib csv module
+    pacsv = None
+
+
+def preview(path, n_rows, max_cols=None):
+    """Print the header and first n_rows of a (optionally gzipped) CSV."""
+    if pacsv is not None:
+        # Arrow parses a single 1 MB block: typed schema, no Python tokenizing
+        reader = pacsv.open_csv(path, read_options=pacsv.ReadOptions(block_size=1 << 20))
+        header = reader.schema.names
+        print(f"Columns ({len(header)}): {header}")
+        print(f"Types: {[str(t) for t in reader.schema.types][:max_cols]}")
+        rows = reader.read_next_batch().slice(0, n_rows).to_pylist()
+        rows = [list(row.values()) for row in rows]
+    else:
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            print(f"Columns ({len(header)}): {header}")
+            rows = [row for _, row in zip(range(n_rows), reader)]
+
+    print(f"\nFirst {n_rows} rows:")
+    for i, row in enumerate(rows):
+        if max_cols is not None:
+            print(f"Row {i+1}: {row[:max_cols]}...")
+        else:
+            print(f"Row {i+1}: {row}")
+
+
 print("=" * 80)
 print("QUICK DATASET CHECK")
 print("=" * 80)
@@ -14,18 +49,7 @@ print("\n1. CRITEO UPLIFT DATASET")
 print("-" * 80)
 
 try:
-    with gzip.open('Data/criteo-uplift-v2.1.csv.gz', 'rt') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        print(f"Columns ({len(header)}): {header}")
-        
-        # Read first few rows
-        print("\nFirst 5 rows:")
-        for i, row in enumerate(reader):
-            if i >= 5:
-                break
-            print(f"Row {i+1}: {row[:10]}...")  # First 10 columns
-        
+    preview('Data/criteo-uplift-v2.1.csv.gz', 5, max_cols=10)  # First 10 columns
 except Exception as e:
     print(f"Error: {e}")
 
@@ -34,17 +58,7 @@ print("\n2. KUAIREC USER FEATURES")
 print("-" * 80)
 
 try:
-    with open('Data/user_features_raw.csv', 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        print(f"Columns ({len(header)}): {header}")
-        
-        print("\nFirst 3 rows:")
-        for i, row in enumerate(reader):
-            if i >= 3:
-                break
-            print(f"Row {i+1}: {row}")
-        
+    preview('Data/user_features_raw.csv', 3)
 except Exception as e:
     print(f"Error: {e}")
 
@@ -52,17 +66,7 @@ print("\n3. KUAIREC VIDEO CATEGORIES")
 print("-" * 80)
 
 try:
-    with open('Data/video_raw_categories_multi.csv', 'r', encoding='utf-8') as f:
-        reader = csv.reader(f)
-        header = next(reader)
-        print(f"Columns ({len(header)}): {header}")
-        
-        print("\nFirst 3 rows:")
-        for i, row in enumerate(reader):
-            if i >= 3:
-                break
-            print(f"Row {i+1}: {row}")
-        
+    preview('Data/video_raw_categories_multi.csv', 3)
 except Exception as e:
     print(f"Error: {e}")
 
@@ -27,13 +27,15 @@ import argparse
 import json
 from datetime import datetime
 
+import pandas as pd
+
 # PROXIMA imports
 from proxima.generator.simulate import generate_synthetic_experiments
-from proxima.models.baseline import ProxyScorer
-from proxima.evaluation.decision_sim import DecisionSimulator
+from proxima.models.baseline import EARLY_METRICS, score_proxies
+from proxima.evaluation.decision_sim import compare_decision_strategies
 from proxima.visualization.plots import (
-    plot_proxy_reliability,
-    plot_decision_simulation,
+    plot_reliability_comparison,
+    plot_decision_simulation_results,
 )
 
 
@@ -55,48 +57,48 @@ def main():
     output_dir = ROOT_DIR / args.output_dir
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Step 1: Generate synthetic data
+    # Step 1: Generate synthetic data. All experiments live in one columnar
+    # frame keyed by exp_id, so scoring and simulation below are grouped
+    # reductions over a single table rather than per-experiment loops.
     print("\n[1/4] Generating synthetic experiment data...")
-    experiments = generate_synthetic_experiments(
+    df = generate_synthetic_experiments(
         n_users=args.n_users,
         n_experiments=args.n_experiments,
         seed=args.seed,
     )
-    print(f"  Generated {len(experiments)} experiments with {args.n_users} users each")
+    print(f"  Generated {df['exp_id'].nunique()} experiments with {len(df):,} users in total")
 
     # Step 2: Score proxies
     print("\n[2/4] Computing proxy reliability scores...")
-    scorer = ProxyScorer()
-    proxy_scores = scorer.score_all(experiments)
+    proxy_scores, _ = score_proxies(df)
     
     print("\n  Proxy Reliability Scores:")
     print("  " + "-" * 50)
-    for metric, scores in proxy_scores.items():
-        print(f"  {metric:20s} | Reliability: {scores['reliability']:.3f} | "
-              f"Corr: {scores['correlation']:.3f} | DA: {scores['directional_accuracy']:.3f}")
+    for row in proxy_scores.itertuples(index=False):
+        print(f"  {row.metric:20s} | Reliability: {row.reliability:.3f} | "
+              f"Corr: {row.effect_corr:.3f} | DA: {row.directional_accuracy:.3f}")
 
     # Step 3: Run decision simulation
     print("\n[3/4] Running decision simulation...")
-    simulator = DecisionSimulator()
-    decision_results = simulator.simulate_all(experiments, proxy_scores)
+    decision_results = compare_decision_strategies(df, EARLY_METRICS)
     
     print("\n  Decision Simulation Results:")
     print("  " + "-" * 50)
-    for metric, results in decision_results.items():
-        print(f"  {metric:20s} | Win Rate: {results['win_rate']:.3f} | "
-              f"FPR: {results['fpr']:.3f} | FNR: {results['fnr']:.3f}")
+    for row in decision_results.itertuples(index=False):
+        print(f"  {row.proxy_metric:20s} | Win Rate: {row.win_rate:.3f} | "
+              f"FPR: {row.false_positive_rate:.3f} | FNR: {row.false_negative_rate:.3f}")
 
     # Step 4: Generate figures
     print("\n[4/4] Generating paper figures...")
     
     # Figure 1: Proxy reliability
     fig1_path = output_dir / "figure1_proxy_reliability.png"
-    plot_proxy_reliability(proxy_scores, save_path=str(fig1_path))
+    plot_reliability_comparison(proxy_scores, save_path=fig1_path, show=False)
     print(f"  Saved: {fig1_path}")
     
     # Figure 2: Decision simulation
     fig2_path = output_dir / "figure2_decision_simulation.png"
-    plot_decision_simulation(decision_results, save_path=str(fig2_path))
+    plot_decision_simulation_results(decision_results, save_path=fig2_path, show=False)
     print(f"  Saved: {fig2_path}")
     
     # Summary table
@@ -123,29 +125,19 @@ def main():
     print("=" * 60)
 
 
-def _save_summary_table(proxy_scores: dict, decision_results: dict, path: Path):
-    """Save summary table as CSV."""
-    import csv
-    
-    with open(path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["metric", "reliability", "correlation", "directional_accuracy", 
-                         "fragility_rate", "win_rate", "fpr", "fnr", "regret"])
-        
-        for metric in proxy_scores:
-            ps = proxy_scores[metric]
-            dr = decision_results.get(metric, {})
-            writer.writerow([
-                metric,
-                f"{ps.get('reliability', 0):.4f}",
-                f"{ps.get('correlation', 0):.4f}",
-                f"{ps.get('directional_accuracy', 0):.4f}",
-                f"{ps.get('fragility_rate', 0):.4f}",
-                f"{dr.get('win_rate', 0):.4f}",
-                f"{dr.get('fpr', 0):.4f}",
-                f"{dr.get('fnr', 0):.4f}",
-                f"{dr.get('regret', 0):.4f}",
-            ])
+def _save_summary_table(proxy_scores: pd.DataFrame, decision_results: pd.DataFrame, path: Path):
+    """Save summary table as CSV (one row per proxy metric)."""
+    summary = proxy_scores.merge(
+        decision_results, left_on="metric", right_on="proxy_metric", how="left"
+    ).rename(columns={
+        "effect_corr": "correlation",
+        "false_positive_rate": "fpr",
+        "false_negative_rate": "fnr",
+        "avg_regret": "regret",
+    })
+    columns = ["metric", "reliability", "correlation", "directional_accuracy",
+               "fragility_rate", "win_rate", "fpr", "fnr", "regret"]
+    summary[columns].fillna(0).to_csv(path, index=False, float_format="%.4f")
 
 
 if __name__ == "__main__":
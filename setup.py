@@ -30,6 +30,7 @@ setup(
         "pandas>=2.0.0",
         "scipy>=1.10.0",
         "scikit-learn>=1.3.0",
+        "joblib>=1.3.0",
         "matplotlib>=3.7.0",
         "seaborn>=0.12.0",
         "plotly>=5.14.0",
@@ -39,10 +40,18 @@ setup(
         "pydantic>=2.0.0",
     ],
     extras_require={
+        "data": [
+            "pyarrow>=14.0.0",
+            "rapidgzip>=0.10.0",
+        ],
+        "fast": [
+            "numba>=0.58.0",
+        ],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
             "pytest-asyncio>=0.21.0",
+            "httpx>=0.24.0",
             "mypy>=1.5.0",
             "jupyter>=1.0.0",
         ],
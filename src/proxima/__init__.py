@@ -15,6 +15,7 @@ from proxima.models.baseline import (
     score_proxies,
     train_long_term_model,
     compute_diff_in_means_effect,
+    compute_overall_effect,
     compute_segment_effects,
     find_top_fragility_segments,
 )
@@ -24,6 +25,7 @@ __all__ = [
     "score_proxies",
     "train_long_term_model",
     "compute_diff_in_means_effect",
+    "compute_overall_effect",
     "compute_segment_effects",
     "find_top_fragility_segments",
 ]
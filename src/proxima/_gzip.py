@@ -0,0 +1,53 @@
+"""
+Optional parallel gzip decompression.
+
+rapidgzip is an optional dependency (``pip install proxima[data]``). When it
+is installed, ``gzip_source`` opens a .gz file with one decompression thread
+per core and keeps the seek-point index in a ``<file>.gzi`` sidecar so later
+runs skip block discovery. Without it the plain path is yielded and the CSV
+reader decompresses the stream itself.
+"""
+
+from __future__ import annotations
+
+import os
+from contextlib import contextmanager
+from typing import IO, Iterator, Union
+
+try:
+    import rapidgzip
+
+    RAPIDGZIP_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without rapidgzip
+    rapidgzip = None
+    RAPIDGZIP_AVAILABLE = False
+
+
+@contextmanager
+def gzip_source(path: str) -> Iterator[Union[str, IO[bytes]]]:
+    """
+    Yield something pandas/pyarrow CSV readers accept for a gzipped file.
+
+    Args:
+        path: Path to a .gz file
+
+    Yields:
+        A decompressed binary file object (rapidgzip) or ``path`` unchanged
+    """
+    if not RAPIDGZIP_AVAILABLE:
+        yield path
+        return
+
+    index_path = path + ".gzi"
+    f = rapidgzip.open(path, parallelization=0)
+    try:
+        if os.path.exists(index_path):
+            f.import_index(index_path)
+        yield f
+        if not os.path.exists(index_path):
+            f.export_index(index_path)
+    finally:
+        f.close()
+
+
+__all__ = ["RAPIDGZIP_AVAILABLE", "gzip_source"]
@@ -0,0 +1,38 @@
+"""
+Optional Numba support.
+
+Numba is an optional dependency (``pip install proxima[fast]``). Kernels are
+decorated with ``njit`` from here so they still import without it; callers
+check ``NUMBA_AVAILABLE`` and fall back to the pandas/NumPy path otherwise.
+
+When ``NUMBA_WARMUP`` is True, kernels are compiled (or loaded from Numba's
+on-disk cache) when their module is imported: the bootstrap and sigmoid
+kernels through eager signatures, the effect kernels through a warm-up call
+for each dtype and memory layout their callers pass. So no request pays JIT
+compilation. Set ``SKIP_WARMUP=1`` to defer compilation to each kernel's
+first call instead (``NUMBA_WARMUP`` is then False), e.g. for CLI or plotting
+use that never runs the kernels.
+"""
+
+from __future__ import annotations
+import os
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (bare or with options)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+NUMBA_WARMUP = NUMBA_AVAILABLE and not os.environ.get("SKIP_WARMUP")
+
+
+__all__ = ["NUMBA_AVAILABLE", "NUMBA_WARMUP", "njit", "prange"]
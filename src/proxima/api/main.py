@@ -9,10 +9,13 @@ Provides REST API endpoints for:
 """
 
 from __future__ import annotations
-from fastapi import FastAPI, HTTPException
+import asyncio
+import hashlib
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional, Any
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Any, Tuple
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -21,6 +24,7 @@ from proxima.generator.simulate import generate_synthetic_experiments
 from proxima.models.baseline import (
     score_proxies,
     find_top_fragility_segments,
+    _experiment_deltas,
     EARLY_METRICS
 )
 from proxima.evaluation.decision_sim import compare_decision_strategies
@@ -85,8 +89,165 @@ class AnalysisResponse(BaseModel):
     data_summary: Dict[str, Any]
 
 
-# Global state (in production, use proper state management)
-current_data: Optional[pd.DataFrame] = None
+# Column dtype for each numeric field type used in the response models
+_FIELD_DTYPES = {float: "float64", int: "int64"}
+
+
+def _to_models(model, df: pd.DataFrame) -> list:
+    """
+    Build one response model per DataFrame row.
+
+    Numeric columns are cast once to the model's declared field types, so
+    to_dict("records") (one pass, native Python scalars) hands model_validate
+    values that need no per-cell coercion. Columns the model does not declare
+    are ignored and missing optional fields take their defaults.
+    """
+    dtypes = {
+        name: _FIELD_DTYPES[field.annotation]
+        for name, field in model.model_fields.items()
+        if field.annotation in _FIELD_DTYPES and name in df.columns
+    }
+    records = df.astype(dtypes).to_dict(orient="records")
+    return [model.model_validate(record) for record in records]
+
+
+@dataclass(frozen=True)
+class DataBundle:
+    """A generated dataset tagged with its version; replaced, never mutated."""
+    df: pd.DataFrame
+    version: int
+
+
+# Global state (in production, use proper state management). Generating data
+# swaps in a new bundle; each request works on the bundle it started with, so
+# a concurrent regeneration never mixes two datasets in one response.
+_bundle: Optional[DataBundle] = None
+
+# Analysis results keyed by (bundle version, result key), shared across
+# endpoints and requests. Entries are futures, so concurrent requests for the
+# same result wait on a single computation. Only the current version's
+# results are kept.
+_analysis_cache: Dict[Tuple[int, Any], "asyncio.Future[Any]"] = {}
+
+
+def _require_bundle() -> DataBundle:
+    """The current data bundle, or a 400 if no data has been generated."""
+    if _bundle is None:
+        raise HTTPException(status_code=400, detail="No data loaded. Generate data first.")
+    return _bundle
+
+
+async def _memoize(bundle: DataBundle, key: Any, start):
+    """
+    Return the cached result for key on bundle, awaiting start() on first use.
+
+    Concurrent callers share the one pending future. Each waits on it through
+    asyncio.shield, so a cancelled request (client disconnect, timeout) stops
+    waiting without cancelling the computation for the others. Failed or
+    cancelled computations, and results for a bundle that has since been
+    replaced, are not cached.
+    """
+    cache_key = (bundle.version, key)
+    future = _analysis_cache.get(cache_key)
+    if future is None:
+        future = asyncio.ensure_future(start())
+        if bundle is _bundle:
+            _analysis_cache[cache_key] = future
+
+            def evict_failed(done: "asyncio.Future[Any]") -> None:
+                if done.cancelled() or done.exception() is not None:
+                    if _analysis_cache.get(cache_key) is done:
+                        del _analysis_cache[cache_key]
+
+            future.add_done_callback(evict_failed)
+    return await asyncio.shield(future)
+
+
+async def _cached(bundle: DataBundle, key: Any, compute, *args, **kwargs):
+    """
+    Return the cached result for key on bundle, computing it on first use.
+
+    The pandas/NumPy work runs in a worker thread (it releases the GIL in its
+    inner loops) so the event loop keeps serving other requests; cache hits
+    return without leaving the loop.
+    """
+    return await _memoize(bundle, key, lambda: asyncio.to_thread(compute, *args, **kwargs))
+
+
+def _data_summary(df: pd.DataFrame) -> Dict[str, Any]:
+    """Size and failure-cohort summary of a dataset, from NumPy reductions."""
+    failure_cohort = df["failure_cohort"].to_numpy()
+    n_failure_cohort = int(failure_cohort.sum())
+    return {
+        "n_users": failure_cohort.size,
+        "n_experiments": int(df["exp_id"].nunique()),
+        "n_failure_cohort": n_failure_cohort,
+        "failure_cohort_rate": n_failure_cohort / failure_cohort.size,
+    }
+
+
+async def _get_summary(bundle: DataBundle) -> Dict[str, Any]:
+    """Data summary for a bundle."""
+    return await _cached(bundle, "summary", _data_summary, bundle.df)
+
+
+async def _get_effects(bundle: DataBundle) -> pd.DataFrame:
+    """Experiment-level effects of every metric, shared by the analyses below."""
+    return await _cached(
+        bundle, "effects", _experiment_deltas, bundle.df, ["long_retained", *EARLY_METRICS]
+    )
+
+
+async def _get_scores(bundle: DataBundle) -> pd.DataFrame:
+    """Proxy score details for a bundle."""
+    effects = await _get_effects(bundle)
+    details, _ = await _cached(bundle, "scores", score_proxies, bundle.df, exp_effects=effects)
+    return details
+
+
+async def _get_decisions(bundle: DataBundle) -> pd.DataFrame:
+    """Decision simulation results for a bundle."""
+    effects = await _get_effects(bundle)
+    return await _cached(
+        bundle, "decisions", compare_decision_strategies, bundle.df, EARLY_METRICS,
+        exp_effects=effects,
+    )
+
+
+async def _get_fragility(bundle: DataBundle, proxy_metric: str, min_count: int) -> pd.DataFrame:
+    """Fragile segments for a proxy metric on a bundle."""
+    effects = await _get_effects(bundle)
+    return await _cached(
+        bundle, ("fragility", proxy_metric, min_count),
+        find_top_fragility_segments, bundle.df, proxy_metric,
+        min_count=min_count, exp_effects=effects,
+    )
+
+
+# Response models built from the cached results above, so endpoints that
+# share a result (including /api/full-analysis) validate each row only once
+
+async def _get_score_models(bundle: DataBundle) -> List[ProxyScoreResponse]:
+    """Proxy score response models for a bundle."""
+    async def build():
+        return _to_models(ProxyScoreResponse, await _get_scores(bundle))
+    return await _memoize(bundle, "score_models", build)
+
+
+async def _get_decision_models(bundle: DataBundle) -> List[DecisionResult]:
+    """Decision simulation response models for a bundle."""
+    async def build():
+        return _to_models(DecisionResult, await _get_decisions(bundle))
+    return await _memoize(bundle, "decision_models", build)
+
+
+async def _get_fragility_models(
+    bundle: DataBundle, proxy_metric: str, min_count: int
+) -> List[FragilitySegment]:
+    """Fragile segment response models (all rows, most fragile first)."""
+    async def build():
+        return _to_models(FragilitySegment, await _get_fragility(bundle, proxy_metric, min_count))
+    return await _memoize(bundle, ("fragility_models", proxy_metric, min_count), build)
 
 
 @app.get("/")
@@ -96,31 +257,33 @@ async def root():
         "service": "PROXIMA API",
         "version": "0.1.0",
         "status": "running",
-        "data_loaded": current_data is not None
+        "data_loaded": _bundle is not None
     }
 
 
 @app.post("/api/generate-data")
 async def generate_data(request: GenerateDataRequest):
     """Generate synthetic experiment data."""
-    global current_data
+    global _bundle
     
     try:
-        current_data = generate_synthetic_experiments(
+        df = await asyncio.to_thread(
+            generate_synthetic_experiments,
             n_users=request.n_users,
             n_experiments=request.n_experiments,
             seed=request.seed
         )
+        bundle = DataBundle(df=df, version=_bundle.version + 1 if _bundle else 0)
+        _bundle = bundle
+        _analysis_cache.clear()
+        summary = await _get_summary(bundle)
         
         return {
             "status": "success",
             "message": "Data generated successfully",
             "summary": {
-                "n_users": len(current_data),
-                "n_experiments": int(current_data["exp_id"].nunique()),
-                "n_failure_cohort": int(current_data["failure_cohort"].sum()),
-                "failure_cohort_rate": float(current_data["failure_cohort"].mean()),
-                "columns": list(current_data.columns)
+                **summary,
+                "columns": list(bundle.df.columns)
             }
         }
     except Exception as e:
@@ -130,26 +293,10 @@ async def generate_data(request: GenerateDataRequest):
 @app.get("/api/proxy-scores")
 async def get_proxy_scores() -> List[ProxyScoreResponse]:
     """Get proxy metric reliability scores."""
-    global current_data
-    
-    if current_data is None:
-        raise HTTPException(status_code=400, detail="No data loaded. Generate data first.")
+    bundle = _require_bundle()
     
     try:
-        details, _ = score_proxies(current_data)
-        
-        scores = []
-        for _, row in details.iterrows():
-            scores.append(ProxyScoreResponse(
-                metric=row["metric"],
-                reliability=float(row["reliability"]),
-                effect_corr=float(row["effect_corr"]),
-                directional_accuracy=float(row["directional_accuracy"]),
-                fragility_rate=float(row["fragility_rate"]),
-                n_experiments_scored=int(row["n_experiments_scored"])
-            ))
-        
-        return scores
+        return await _get_score_models(bundle)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -157,29 +304,14 @@ async def get_proxy_scores() -> List[ProxyScoreResponse]:
 @app.get("/api/fragility/{proxy_metric}")
 async def get_fragility(proxy_metric: str, min_count: int = 500) -> List[FragilitySegment]:
     """Get fragile segments for a specific proxy metric."""
-    global current_data
-    
-    if current_data is None:
-        raise HTTPException(status_code=400, detail="No data loaded. Generate data first.")
+    bundle = _require_bundle()
     
     if proxy_metric not in EARLY_METRICS:
         raise HTTPException(status_code=400, detail=f"Invalid metric. Choose from: {EARLY_METRICS}")
     
     try:
-        frag_df = find_top_fragility_segments(current_data, proxy_metric, min_count=min_count)
-        
-        segments = []
-        for _, row in frag_df.head(20).iterrows():
-            segments.append(FragilitySegment(
-                region=row.get("region"),
-                device=row.get("device"),
-                tenure=row.get("tenure"),
-                flip_rate=float(row["flip_rate"]),
-                n_cells=int(row["n_cells"]),
-                avg_cell_n=float(row["avg_cell_n"])
-            ))
-        
-        return segments
+        segments = await _get_fragility_models(bundle, proxy_metric, min_count)
+        return segments[:20]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -187,105 +319,61 @@ async def get_fragility(proxy_metric: str, min_count: int = 500) -> List[Fragili
 @app.get("/api/decision-simulation")
 async def get_decision_simulation() -> List[DecisionResult]:
     """Get decision simulation results for all proxy metrics."""
-    global current_data
-
-    if current_data is None:
-        raise HTTPException(status_code=400, detail="No data loaded. Generate data first.")
+    bundle = _require_bundle()
 
     try:
-        decision_df = compare_decision_strategies(current_data, EARLY_METRICS)
-
-        results = []
-        for _, row in decision_df.iterrows():
-            results.append(DecisionResult(
-                proxy_metric=row["proxy_metric"],
-                win_rate=float(row["win_rate"]),
-                false_positive_rate=float(row["false_positive_rate"]),
-                false_negative_rate=float(row["false_negative_rate"]),
-                avg_regret=float(row["avg_regret"]),
-                total_shipped=int(row["total_shipped"]),
-                correct_ships=int(row["correct_ships"]),
-                incorrect_ships=int(row["incorrect_ships"]),
-                missed_opportunities=int(row["missed_opportunities"])
-            ))
-
-        return results
+        return await _get_decision_models(bundle)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/full-analysis")
-async def get_full_analysis() -> AnalysisResponse:
-    """Get complete analysis including proxy scores, decision simulation, and fragility."""
-    global current_data
+async def _build_full_analysis(bundle: DataBundle) -> Tuple[bytes, str]:
+    """Serialized full analysis of a bundle and its ETag."""
+    # Proxy scores (sorted by reliability)
+    proxy_scores = await _get_score_models(bundle)
+    best = proxy_scores[0]
 
-    if current_data is None:
-        raise HTTPException(status_code=400, detail="No data loaded. Generate data first.")
+    # Decision simulation
+    decision_results = await _get_decision_models(bundle)
 
-    try:
-        # Proxy scores
-        details, _ = score_proxies(current_data)
-        proxy_scores = []
-        for _, row in details.iterrows():
-            proxy_scores.append(ProxyScoreResponse(
-                metric=row["metric"],
-                reliability=float(row["reliability"]),
-                effect_corr=float(row["effect_corr"]),
-                directional_accuracy=float(row["directional_accuracy"]),
-                fragility_rate=float(row["fragility_rate"]),
-                n_experiments_scored=int(row["n_experiments_scored"])
-            ))
-
-        # Decision simulation
-        decision_df = compare_decision_strategies(current_data, EARLY_METRICS)
-        decision_results = []
-        for _, row in decision_df.iterrows():
-            decision_results.append(DecisionResult(
-                proxy_metric=row["proxy_metric"],
-                win_rate=float(row["win_rate"]),
-                false_positive_rate=float(row["false_positive_rate"]),
-                false_negative_rate=float(row["false_negative_rate"]),
-                avg_regret=float(row["avg_regret"]),
-                total_shipped=int(row["total_shipped"]),
-                correct_ships=int(row["correct_ships"]),
-                incorrect_ships=int(row["incorrect_ships"]),
-                missed_opportunities=int(row["missed_opportunities"])
-            ))
-
-        # Fragility for top metric
-        top_metric = details.iloc[0]["metric"]
-        frag_df = find_top_fragility_segments(current_data, top_metric, min_count=400)
-        fragile_segments = []
-        for _, row in frag_df.head(15).iterrows():
-            fragile_segments.append(FragilitySegment(
-                region=row.get("region"),
-                device=row.get("device"),
-                tenure=row.get("tenure"),
-                flip_rate=float(row["flip_rate"]),
-                n_cells=int(row["n_cells"]),
-                avg_cell_n=float(row["avg_cell_n"])
-            ))
-
-        # Data summary
-        data_summary = {
-            "n_users": len(current_data),
-            "n_experiments": int(current_data["exp_id"].nunique()),
-            "n_failure_cohort": int(current_data["failure_cohort"].sum()),
-            "failure_cohort_rate": float(current_data["failure_cohort"].mean()),
-            "best_proxy": details.iloc[0]["metric"],
-            "best_reliability": float(details.iloc[0]["reliability"]),
-            "top_fragile_metric": top_metric
-        }
+    # Fragility for top metric
+    top_metric = best.metric
+    fragile_segments = (await _get_fragility_models(bundle, top_metric, 400))[:15]
 
-        return AnalysisResponse(
-            proxy_scores=proxy_scores,
-            decision_results=decision_results,
-            fragile_segments=fragile_segments,
-            data_summary=data_summary
-        )
+    # Data summary
+    data_summary = {
+        **await _get_summary(bundle),
+        "best_proxy": best.metric,
+        "best_reliability": best.reliability,
+        "top_fragile_metric": top_metric
+    }
+
+    body = AnalysisResponse(
+        proxy_scores=proxy_scores,
+        decision_results=decision_results,
+        fragile_segments=fragile_segments,
+        data_summary=data_summary
+    ).model_dump_json().encode()
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return body, etag
+
+
+@app.get("/api/full-analysis", response_model=AnalysisResponse)
+async def get_full_analysis(if_none_match: Optional[str] = Header(default=None)) -> Response:
+    """Get complete analysis including proxy scores, decision simulation, and fragility."""
+    bundle = _require_bundle()
+
+    try:
+        # The serialized payload is cached with the analysis results, so
+        # repeat requests skip model validation and JSON encoding entirely
+        body, etag = await _memoize(bundle, "full_analysis", lambda: _build_full_analysis(bundle))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 
 if __name__ == "__main__":
     import uvicorn
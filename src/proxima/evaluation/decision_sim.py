@@ -10,7 +10,7 @@ Simulates decision-making based on proxy metrics and evaluates:
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -32,7 +32,8 @@ def simulate_shipping_decisions(
     df: pd.DataFrame,
     proxy_metric: str,
     long_metric: str = "long_retained",
-    threshold: float = 0.0
+    threshold: float = 0.0,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> DecisionSimulationResult:
     """
     Simulate shipping decisions based on proxy metric.
@@ -45,55 +46,74 @@ def simulate_shipping_decisions(
         proxy_metric: Name of proxy metric to use for decisions
         long_metric: Name of long-term outcome metric
         threshold: Decision threshold (default 0.0 = ship if positive)
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
     
     Returns:
         DecisionSimulationResult with performance metrics
     """
-    from proxima.models.baseline import compute_diff_in_means_effect
-    
-    # Compute experiment-level effects
-    long_eff = compute_diff_in_means_effect(df, long_metric)
-    proxy_eff = compute_diff_in_means_effect(df, proxy_metric)
+    from proxima.models.baseline import _resolve_deltas
     
-    # Merge effects
-    effects = long_eff.merge(proxy_eff, on="exp_id", suffixes=("_long", "_proxy"))
+    # Experiment-level effects for both metrics in one pass
+    effects = _resolve_deltas(df, list(dict.fromkeys([long_metric, proxy_metric])), exp_effects)
+
+    return _decision_result(
+        proxy_metric,
+        effects[long_metric].to_numpy(dtype=np.float64),
+        effects[proxy_metric].to_numpy(dtype=np.float64),
+        threshold,
+    )
 
-    # After merge, columns are: delta_{metric}_long and delta_{metric}_proxy
-    long_col = f"delta_{long_metric}_long" if f"delta_{long_metric}_long" in effects.columns else f"delta_{long_metric}"
-    proxy_col = f"delta_{proxy_metric}_proxy" if f"delta_{proxy_metric}_proxy" in effects.columns else f"delta_{proxy_metric}"
 
-    # Decision based on proxy
-    effects["proxy_decision"] = effects[proxy_col] > threshold
-    effects["true_positive"] = effects[long_col] > threshold
+def _decision_result(
+    proxy_metric: str,
+    long: np.ndarray,
+    proxy: np.ndarray,
+    threshold: float
+) -> DecisionSimulationResult:
+    """
+    Score ship decisions made on proxy effects against long-term effects.
+    
+    Args:
+        proxy_metric: Name reported in the result
+        long: Experiment-level long-term effects
+        proxy: Experiment-level proxy effects, aligned with long
+        threshold: Decision threshold
+    
+    Returns:
+        DecisionSimulationResult with performance metrics
+    """
+    # Decision based on proxy (NaN effects compare False: not shipped / not positive)
+    proxy_decision = proxy > threshold
+    true_positive = long > threshold
     
     # Outcomes
-    effects["correct_ship"] = effects["proxy_decision"] & effects["true_positive"]
-    effects["incorrect_ship"] = effects["proxy_decision"] & ~effects["true_positive"]
-    effects["missed_opportunity"] = ~effects["proxy_decision"] & effects["true_positive"]
-    effects["correct_no_ship"] = ~effects["proxy_decision"] & ~effects["true_positive"]
+    incorrect_ship = proxy_decision & ~true_positive
+    missed_opportunity = ~proxy_decision & true_positive
     
     # Metrics
-    total_shipped = int(effects["proxy_decision"].sum())
-    correct_ships = int(effects["correct_ship"].sum())
-    incorrect_ships = int(effects["incorrect_ship"].sum())
-    missed_opportunities = int(effects["missed_opportunity"].sum())
+    total_shipped = int(np.count_nonzero(proxy_decision))
+    correct_ships = int(np.count_nonzero(proxy_decision & true_positive))
+    incorrect_ships = int(np.count_nonzero(incorrect_ship))
+    missed_opportunities = int(np.count_nonzero(missed_opportunity))
+    n_true_positive = int(np.count_nonzero(true_positive))
+    n_true_negative = len(long) - n_true_positive
     
     # Win rate: of all shipped experiments, how many were actually positive?
     win_rate = correct_ships / total_shipped if total_shipped > 0 else 0.0
     
     # False positive rate: of all truly negative experiments, how many did we ship?
-    n_true_negative = int((~effects["true_positive"]).sum())
     false_positive_rate = incorrect_ships / n_true_negative if n_true_negative > 0 else 0.0
     
     # False negative rate: of all truly positive experiments, how many did we miss?
-    n_true_positive = int(effects["true_positive"].sum())
     false_negative_rate = missed_opportunities / n_true_positive if n_true_positive > 0 else 0.0
     
     # Regret: opportunity cost of wrong decisions
     # Regret = sum of long-term losses from bad ships + sum of missed gains
-    regret_from_bad_ships = effects.loc[effects["incorrect_ship"], long_col].sum()
-    regret_from_missed = -effects.loc[effects["missed_opportunity"], long_col].sum()
-    avg_regret = float((abs(regret_from_bad_ships) + regret_from_missed) / len(effects))
+    # (nansum: an experiment without a long-term effect contributes nothing)
+    regret_from_bad_ships = np.nansum(long[incorrect_ship])
+    regret_from_missed = -long[missed_opportunity].sum()
+    avg_regret = float((abs(regret_from_bad_ships) + regret_from_missed) / len(long))
     
     return DecisionSimulationResult(
         proxy_metric=proxy_metric,
@@ -112,7 +132,8 @@ def compare_decision_strategies(
     df: pd.DataFrame,
     proxy_metrics: List[str],
     long_metric: str = "long_retained",
-    threshold: float = 0.0
+    threshold: float = 0.0,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """
     Compare multiple proxy metrics as decision strategies.
@@ -122,14 +143,30 @@ def compare_decision_strategies(
         proxy_metrics: List of proxy metric names
         long_metric: Long-term outcome metric
         threshold: Decision threshold
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
     
     Returns:
         DataFrame comparing all strategies
     """
-    results = []
+    from proxima.models.baseline import _resolve_deltas
+    
+    # Experiment-level effects for the outcome and every proxy in one pass;
+    # each strategy below only reads its columns
+    deltas = _resolve_deltas(
+        df, list(dict.fromkeys([long_metric, *proxy_metrics])), exp_effects
+    )
+    long = deltas[long_metric].to_numpy(dtype=np.float64)
     
-    for proxy in proxy_metrics:
-        sim_result = simulate_shipping_decisions(df, proxy, long_metric, threshold)
+    strategies = [(proxy, proxy) for proxy in proxy_metrics]
+    # Add oracle strategy (using true long-term metric)
+    strategies.append(("Oracle (True Long-term)", long_metric))
+    
+    results = []
+    for name, metric in strategies:
+        sim_result = _decision_result(
+            name, long, deltas[metric].to_numpy(dtype=np.float64), threshold
+        )
         results.append({
             "proxy_metric": sim_result.proxy_metric,
             "win_rate": sim_result.win_rate,
@@ -142,20 +179,6 @@ def compare_decision_strategies(
             "missed_opportunities": sim_result.missed_opportunities,
         })
     
-    # Add oracle strategy (using true long-term metric)
-    oracle_result = simulate_shipping_decisions(df, long_metric, long_metric, threshold)
-    results.append({
-        "proxy_metric": "Oracle (True Long-term)",
-        "win_rate": oracle_result.win_rate,
-        "false_positive_rate": oracle_result.false_positive_rate,
-        "false_negative_rate": oracle_result.false_negative_rate,
-        "avg_regret": oracle_result.avg_regret,
-        "total_shipped": oracle_result.total_shipped,
-        "correct_ships": oracle_result.correct_ships,
-        "incorrect_ships": oracle_result.incorrect_ships,
-        "missed_opportunities": oracle_result.missed_opportunities,
-    })
-    
     comparison_df = pd.DataFrame(results).sort_values("win_rate", ascending=False)
     return comparison_df
 
@@ -180,13 +203,10 @@ def compute_regret_by_segment(
     Returns:
         DataFrame with regret by segment
     """
-    from proxima.models.baseline import compute_segment_effects
-    
-    # Get segment-level effects
-    seg_long = compute_segment_effects(df, long_metric, segment_cols)
-    seg_proxy = compute_segment_effects(df, proxy_metric, segment_cols)
+    from proxima.models.baseline import _segment_deltas
     
-    seg = seg_long.merge(seg_proxy, on=["exp_id", *segment_cols], how="inner")
+    # Segment-level effects for both metrics from one groupby pass
+    seg = _segment_deltas(df, list(dict.fromkeys([long_metric, proxy_metric])), segment_cols)
     
     # Decisions
     seg["proxy_decision"] = seg[f"delta_{proxy_metric}"] > threshold
@@ -201,7 +221,7 @@ def compute_regret_by_segment(
     )
     
     # Aggregate by segment
-    regret_summary = seg.groupby(segment_cols).agg(
+    regret_summary = seg.groupby(segment_cols, observed=True).agg(
         avg_regret=("regret", "mean"),
         total_regret=("regret", "sum"),
         error_rate=("wrong_decision", "mean"),
@@ -12,9 +12,11 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 from typing import Tuple, Dict, List, Optional
-from scipy import stats
+from scipy import special
 from dataclasses import dataclass
 
+from proxima._numba import NUMBA_AVAILABLE, NUMBA_WARMUP, njit, prange
+
 
 @dataclass
 class TreatmentEffectResult:
@@ -44,26 +46,27 @@ def compute_effect_with_ci(
     Returns:
         TreatmentEffectResult with effect estimate and statistics
     """
-    control = df[df["treatment"] == 0][y_col].dropna()
-    treatment = df[df["treatment"] == 1][y_col].dropna()
+    t = df["treatment"].to_numpy()
+    y = df[y_col].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(y)
+    control = y[(t == 0) & valid]
+    treatment = y[(t == 1) & valid]
     
     effect = float(treatment.mean() - control.mean())
     
-    # Welch's t-test (unequal variances)
-    t_stat, p_value = stats.ttest_ind(treatment, control, equal_var=False)
-    
-    # Standard error using Welch-Satterthwaite
-    se_control = control.std() / np.sqrt(len(control))
-    se_treatment = treatment.std() / np.sqrt(len(treatment))
-    std_error = np.sqrt(se_control**2 + se_treatment**2)
-    
-    # Degrees of freedom (Welch-Satterthwaite)
-    df_welch = (se_control**2 + se_treatment**2)**2 / (
-        se_control**4 / (len(control) - 1) + se_treatment**4 / (len(treatment) - 1)
+    # Welch standard error and Welch-Satterthwaite degrees of freedom; the
+    # t statistic and p-value follow from the same moments, so there is no
+    # separate ttest_ind pass over the data
+    se0_sq = control.var(ddof=1) / control.size
+    se1_sq = treatment.var(ddof=1) / treatment.size
+    std_error = float(np.sqrt(se0_sq + se1_sq))
+    df_welch = (se0_sq + se1_sq)**2 / (
+        se0_sq**2 / (control.size - 1) + se1_sq**2 / (treatment.size - 1)
     )
+    p_value = 2 * special.stdtr(df_welch, -abs(effect / std_error))
     
     # Confidence interval
-    t_crit = stats.t.ppf(1 - alpha/2, df_welch)
+    t_crit = special.stdtrit(df_welch, 1 - alpha/2)
     ci_lower = effect - t_crit * std_error
     ci_upper = effect + t_crit * std_error
     
@@ -78,12 +81,60 @@ def compute_effect_with_ci(
     )
 
 
+@njit(cache=True)
+def _splitmix64(state: np.uint64) -> Tuple[np.uint64, np.uint64]:
+    """Advance a splitmix64 generator; returns (new_state, random 64-bit word)."""
+    state = state + np.uint64(0x9E3779B97F4A7C15)
+    z = state
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return state, z ^ (z >> np.uint64(31))
+
+
+# Eagerly compiled for both storage dtypes (loaded from the on-disk cache after
+# the first run), so no request pays JIT compilation on its first bootstrap.
+# With SKIP_WARMUP the same kernel compiles lazily on first use instead.
+_BOOTSTRAP_SIGNATURES = [
+    "float64[::1](float32[::1], float32[::1], int64, int64)",
+    "float64[::1](float64[::1], float64[::1], int64, int64)",
+]
+_BOOTSTRAP_OPTIONS = dict(parallel=True, cache=True, fastmath={"reassoc", "contract"})
+
+
+@(njit(_BOOTSTRAP_SIGNATURES, **_BOOTSTRAP_OPTIONS) if NUMBA_WARMUP else njit(**_BOOTSTRAP_OPTIONS))
+def _bootstrap_diffs_kernel(
+    control: np.ndarray, treatment: np.ndarray, n_bootstrap: int, seed: int
+) -> np.ndarray:
+    """
+    Treatment-minus-control mean of n_bootstrap resamples (with replacement).
+
+    Each replicate draws from its own splitmix64 stream derived from
+    (seed, replicate), so results do not depend on how prange schedules
+    replicates across threads.
+    """
+    n_c = np.uint64(control.shape[0])
+    n_t = np.uint64(treatment.shape[0])
+    out = np.empty(n_bootstrap)
+    for b in prange(n_bootstrap):
+        state = np.uint64(seed) ^ (np.uint64(b) * np.uint64(0xD1B54A32D192ED03))
+        sum_c = 0.0
+        for _ in range(control.shape[0]):
+            state, r = _splitmix64(state)
+            sum_c += control[((r >> np.uint64(32)) * n_c) >> np.uint64(32)]
+        sum_t = 0.0
+        for _ in range(treatment.shape[0]):
+            state, r = _splitmix64(state)
+            sum_t += treatment[((r >> np.uint64(32)) * n_t) >> np.uint64(32)]
+        out[b] = sum_t / treatment.shape[0] - sum_c / control.shape[0]
+    return out
+
+
 def bootstrap_effect_ci(
     df: pd.DataFrame,
     y_col: str,
     n_bootstrap: int = 1000,
     alpha: float = 0.05,
-    seed: int = 42
+    seed: Optional[int] = 42
 ) -> Tuple[float, float, float]:
     """
     Bootstrap confidence interval for treatment effect.
@@ -93,30 +144,69 @@ def bootstrap_effect_ci(
         y_col: Outcome column name
         n_bootstrap: Number of bootstrap samples
         alpha: Significance level
-        seed: Random seed
+        seed: Random seed (None for fresh OS entropy)
     
     Returns:
-        Tuple of (effect, ci_lower, ci_upper)
+        Tuple of (effect, ci_lower, ci_upper); all NaN if an arm is empty
     """
-    rng = np.random.default_rng(seed)
+    y = df[y_col].to_numpy()
+    if y.dtype != np.float32:
+        y = y.astype(np.float64)
+    t = df["treatment"].to_numpy()
+    control = y[t == 0]
+    treatment = y[t == 1]
     
-    control = df[df["treatment"] == 0][y_col].values
-    treatment = df[df["treatment"] == 1][y_col].values
+    if len(control) == 0 or len(treatment) == 0:
+        return float("nan"), float("nan"), float("nan")
     
-    bootstrap_effects = []
-    for _ in range(n_bootstrap):
-        control_sample = rng.choice(control, size=len(control), replace=True)
-        treatment_sample = rng.choice(treatment, size=len(treatment), replace=True)
-        bootstrap_effects.append(treatment_sample.mean() - control_sample.mean())
+    if NUMBA_AVAILABLE:
+        if seed is None:
+            # The kernel needs an int64 seed: take 63 bits of fresh entropy
+            seed = np.random.SeedSequence().entropy & ((1 << 63) - 1)
+        # Resamples are drawn and summed (in float64) inside the kernel; no
+        # index arrays or per-replicate Python calls
+        bootstrap_effects = _bootstrap_diffs_kernel(control, treatment, n_bootstrap, seed)
+    else:
+        rng = np.random.default_rng(seed)
+        bootstrap_effects = []
+        for _ in range(n_bootstrap):
+            control_sample = rng.choice(control, size=len(control), replace=True)
+            treatment_sample = rng.choice(treatment, size=len(treatment), replace=True)
+            bootstrap_effects.append(treatment_sample.mean() - control_sample.mean())
+        bootstrap_effects = np.array(bootstrap_effects)
     
-    bootstrap_effects = np.array(bootstrap_effects)
-    effect = float(treatment.mean() - control.mean())
-    ci_lower = float(np.percentile(bootstrap_effects, 100 * alpha / 2))
-    ci_upper = float(np.percentile(bootstrap_effects, 100 * (1 - alpha / 2)))
+    effect = float(treatment.mean(dtype=np.float64) - control.mean(dtype=np.float64))
+    # Both percentiles from one call (a single partition of the array)
+    ci_lower, ci_upper = (float(q) for q in np.quantile(bootstrap_effects, [alpha / 2, 1 - alpha / 2]))
     
     return effect, ci_lower, ci_upper
 
 
+def _experiment_arm_stats(df: pd.DataFrame, y_col: str) -> pd.DataFrame:
+    """
+    Per-experiment, per-arm count/mean/variance of y_col from one groupby.
+
+    NaNs are skipped (like dropna on each arm) and experiments keep their
+    order of first appearance. Moments are computed in float64 whatever the
+    column's storage dtype.
+
+    Returns:
+        DataFrame indexed by exp_id with columns n0, n1, m0, m1, v0, v1
+        (0 = control, 1 = treatment; counts are 0 for a missing arm)
+    """
+    y = df[y_col].astype(np.float64)
+    g = y.groupby([df["exp_id"], df["treatment"]]).agg(["count", "mean", "var"]).unstack("treatment")
+    g = g.reindex(pd.unique(df["exp_id"]))
+    return pd.DataFrame({
+        "n0": g[("count", 0)].fillna(0).astype(int),
+        "n1": g[("count", 1)].fillna(0).astype(int),
+        "m0": g[("mean", 0)],
+        "m1": g[("mean", 1)],
+        "v0": g[("var", 0)],
+        "v1": g[("var", 1)],
+    })
+
+
 def compute_experiment_effects_with_ci(
     df: pd.DataFrame,
     y_col: str,
@@ -125,6 +215,9 @@ def compute_experiment_effects_with_ci(
     """
     Compute per-experiment treatment effects with confidence intervals.
     
+    Equivalent to compute_effect_with_ci on every experiment, evaluated as
+    array operations over one groupby instead of a filter per experiment.
+    
     Args:
         df: DataFrame with exp_id, treatment, and y_col
         y_col: Outcome column name
@@ -133,25 +226,34 @@ def compute_experiment_effects_with_ci(
     Returns:
         DataFrame with columns [exp_id, effect, ci_lower, ci_upper, p_value, significant]
     """
-    results = []
-    
-    for exp_id in df["exp_id"].unique():
-        exp_df = df[df["exp_id"] == exp_id]
-        result = compute_effect_with_ci(exp_df, y_col, alpha)
-        
-        results.append({
-            "exp_id": exp_id,
-            "effect": result.effect,
-            "std_error": result.std_error,
-            "ci_lower": result.ci_lower,
-            "ci_upper": result.ci_upper,
-            "p_value": result.p_value,
-            "significant": result.p_value < alpha,
-            "n_control": result.n_control,
-            "n_treatment": result.n_treatment,
-        })
-    
-    return pd.DataFrame(results)
+    arms = _experiment_arm_stats(df, y_col)
+    n0, n1 = arms["n0"].to_numpy(), arms["n1"].to_numpy()
+    
+    effect = (arms["m1"] - arms["m0"]).to_numpy()
+    
+    # Welch standard error and Welch-Satterthwaite degrees of freedom
+    se0_sq = arms["v0"].to_numpy() / n0
+    se1_sq = arms["v1"].to_numpy() / n1
+    std_error = np.sqrt(se0_sq + se1_sq)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df_welch = (se0_sq + se1_sq)**2 / (se0_sq**2 / (n0 - 1) + se1_sq**2 / (n1 - 1))
+        t_stat = effect / std_error
+    p_value = 2 * special.stdtr(df_welch, -np.abs(t_stat))
+    
+    # Confidence interval
+    t_crit = special.stdtrit(df_welch, 1 - alpha/2)
+    
+    return pd.DataFrame({
+        "exp_id": arms.index.to_numpy(),
+        "effect": effect,
+        "std_error": std_error,
+        "ci_lower": effect - t_crit * std_error,
+        "ci_upper": effect + t_crit * std_error,
+        "p_value": p_value,
+        "significant": p_value < alpha,
+        "n_control": n0,
+        "n_treatment": n1,
+    })
 
 
 def compute_proxy_correlation_with_ci(
@@ -176,35 +278,34 @@ def compute_proxy_correlation_with_ci(
     Returns:
         Dictionary with correlation, ci_lower, ci_upper, p_value
     """
-    from proxima.models.baseline import compute_diff_in_means_effect
-    
-    # Get experiment-level effects
-    long_eff = compute_diff_in_means_effect(df, long_col).set_index("exp_id")[f"delta_{long_col}"]
-    proxy_eff = compute_diff_in_means_effect(df, proxy_col).set_index("exp_id")[f"delta_{proxy_col}"]
+    from proxima.models.baseline import _experiment_deltas
     
-    aligned = pd.concat([long_eff, proxy_eff], axis=1, join="inner").dropna()
+    # Experiment-level effects for both metrics from one pass, already aligned
+    deltas = _experiment_deltas(df, list(dict.fromkeys([long_col, proxy_col])))
+    aligned = deltas[[long_col, proxy_col]].dropna()
     
     # Observed correlation
     corr = float(aligned.iloc[:, 0].corr(aligned.iloc[:, 1]))
     
-    # Bootstrap CI
+    # Bootstrap CI: one (n_bootstrap, n) index matrix (the same draws as n
+    # successive rng.choice calls), then every Pearson correlation at once
+    # from centered row sums
     rng = np.random.default_rng(seed)
-    bootstrap_corrs = []
     n = len(aligned)
-    
-    for _ in range(n_bootstrap):
-        indices = rng.choice(n, size=n, replace=True)
-        sample = aligned.iloc[indices]
-        bootstrap_corrs.append(sample.iloc[:, 0].corr(sample.iloc[:, 1]))
-    
-    bootstrap_corrs = np.array(bootstrap_corrs)
-    ci_lower = float(np.percentile(bootstrap_corrs, 100 * alpha / 2))
-    ci_upper = float(np.percentile(bootstrap_corrs, 100 * (1 - alpha / 2)))
+    indices = rng.integers(0, n, size=(n_bootstrap, n))
+    x = aligned.iloc[:, 0].to_numpy(dtype=np.float64)[indices]
+    y = aligned.iloc[:, 1].to_numpy(dtype=np.float64)[indices]
+    x -= x.mean(axis=1, keepdims=True)
+    y -= y.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bootstrap_corrs = (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+    # Both percentiles from one call (a single partition of the array)
+    ci_lower, ci_upper = (float(q) for q in np.quantile(bootstrap_corrs, [alpha / 2, 1 - alpha / 2]))
     
     # Fisher's z-transformation for p-value
     z = 0.5 * np.log((1 + corr) / (1 - corr))
     se_z = 1 / np.sqrt(n - 3)
-    p_value = 2 * (1 - stats.norm.cdf(abs(z) / se_z))
+    p_value = 2 * (1 - special.ndtr(abs(z) / se_z))
     
     return {
         "correlation": corr,
@@ -7,8 +7,9 @@ Adds rigorous statistical validation to proxy metric evaluation.
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from scipy import stats
-from typing import Tuple
+from scipy import special, stats
+from joblib import Parallel, delayed, effective_n_jobs
+from typing import List, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -64,7 +65,7 @@ def compute_correlation_significance(
     # Fisher's z-transformation for confidence interval
     z = np.arctanh(r)
     se = 1 / np.sqrt(n - 3)
-    z_crit = stats.norm.ppf(1 - alpha/2)
+    z_crit = special.ndtri(1 - alpha/2)
     
     ci_lower = np.tanh(z - z_crit * se)
     ci_upper = np.tanh(z + z_crit * se)
@@ -96,49 +97,89 @@ def compute_treatment_effect_significance(
     Returns:
         DataFrame with significance test results per experiment
     """
-    from proxima.models.baseline import compute_diff_in_means_effect
-    
-    results = []
+    from proxima.evaluation.metrics import _experiment_arm_stats
+
+    # Per-arm count/mean/variance for every experiment from one groupby
+    arms = _experiment_arm_stats(df, metric)
+    arms = arms[(arms["n0"] >= 2) & (arms["n1"] >= 2)]
+
+    n_c, n_t = arms["n0"].to_numpy(), arms["n1"].to_numpy()
+    mean_c, mean_t = arms["m0"].to_numpy(), arms["m1"].to_numpy()
+    var_c, var_t = arms["v0"].to_numpy(), arms["v1"].to_numpy()
+
+    # Welch's t-test (doesn't assume equal variances)
+    diff = mean_t - mean_c
+    se_c, se_t = var_c / n_c, var_t / n_t
+    se_diff = np.sqrt(se_c + se_t)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stat = diff / se_diff
+        welch_df = (se_c + se_t) ** 2 / (se_c ** 2 / (n_c - 1) + se_t ** 2 / (n_t - 1))
+    p_value = 2 * special.stdtr(welch_df, -np.abs(t_stat))
+
+    # Effect size (Cohen's d)
+    pooled_std = np.sqrt((var_c + var_t) / 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cohens_d = np.where(pooled_std > 0, diff / pooled_std, 0.0)
+
+    # Confidence interval for difference in means
+    t_crit = special.stdtrit(n_c + n_t - 2, 1 - alpha/2)
+
+    return pd.DataFrame({
+        'exp_id': arms.index.to_numpy(),
+        'metric': metric,
+        'effect': diff,
+        't_statistic': t_stat,
+        'p_value': p_value,
+        'is_significant': p_value < alpha,
+        'cohens_d': cohens_d,
+        'ci_lower': diff - t_crit * se_diff,
+        'ci_upper': diff + t_crit * se_diff,
+        'n_control': n_c,
+        'n_treatment': n_t
+    })
+
+
+def _bootstrap_reliabilities(
+    exp_deltas: pd.DataFrame,
+    seg_deltas: pd.DataFrame,
+    exp_ids: np.ndarray,
+    proxy_metric: str,
+    seeds: List[np.random.SeedSequence]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reliability of proxy_metric on one experiment-level bootstrap sample per
+    seed.
+
+    Scoring a resampled frame only sees each sampled experiment's effects (a
+    repeated experiment has the same means), so each sample is scored from
+    the rows of the precomputed experiment and segment effects of the
+    distinct sampled experiments instead of re-aggregating resampled rows.
+
+    Returns:
+        Tuple of (scores, ok): scores[i] is only meaningful where ok[i], i.e.
+        where scoring the i-th sample succeeded
+    """
+    from proxima.models.baseline import _score_from_deltas
     
-    for exp_id in df['exp_id'].unique():
-        exp_data = df[df['exp_id'] == exp_id]
-        
-        control = exp_data[exp_data['treatment'] == 0][metric].dropna()
-        treatment = exp_data[exp_data['treatment'] == 1][metric].dropna()
+    seg_exp_ids = seg_deltas['exp_id'].to_numpy()
+    scores = np.empty(len(seeds), dtype=np.float64)
+    ok = np.zeros(len(seeds), dtype=bool)
+    for i, seed in enumerate(seeds):
+        # Resample experiments with replacement
+        rng = np.random.default_rng(seed)
+        sampled_exp_ids = np.unique(rng.choice(exp_ids, size=len(exp_ids), replace=True))
         
-        if len(control) < 2 or len(treatment) < 2:
+        # Compute reliability
+        try:
+            boot_details, _ = _score_from_deltas(
+                exp_deltas.loc[sampled_exp_ids],
+                seg_deltas[np.isin(seg_exp_ids, sampled_exp_ids)],
+            )
+            scores[i] = boot_details[boot_details['metric'] == proxy_metric]['reliability'].values[0]
+            ok[i] = True
+        except Exception:
             continue
-        
-        # Welch's t-test (doesn't assume equal variances)
-        t_stat, p_value = stats.ttest_ind(treatment, control, equal_var=False)
-        
-        # Effect size (Cohen's d)
-        pooled_std = np.sqrt((control.var() + treatment.var()) / 2)
-        cohens_d = (treatment.mean() - control.mean()) / pooled_std if pooled_std > 0 else 0
-        
-        # Confidence interval for difference in means
-        diff = treatment.mean() - control.mean()
-        se_diff = np.sqrt(control.var()/len(control) + treatment.var()/len(treatment))
-        t_crit = stats.t.ppf(1 - alpha/2, len(control) + len(treatment) - 2)
-        
-        ci_lower = diff - t_crit * se_diff
-        ci_upper = diff + t_crit * se_diff
-        
-        results.append({
-            'exp_id': exp_id,
-            'metric': metric,
-            'effect': diff,
-            't_statistic': t_stat,
-            'p_value': p_value,
-            'is_significant': p_value < alpha,
-            'cohens_d': cohens_d,
-            'ci_lower': ci_lower,
-            'ci_upper': ci_upper,
-            'n_control': len(control),
-            'n_treatment': len(treatment)
-        })
-    
-    return pd.DataFrame(results)
+    return scores, ok
 
 
 def compute_proxy_reliability_confidence(
@@ -146,7 +187,10 @@ def compute_proxy_reliability_confidence(
     proxy_metric: str,
     long_metric: str = "long_retained",
     n_bootstrap: int = 1000,
-    alpha: float = 0.05
+    alpha: float = 0.05,
+    seed: int = 42,
+    n_jobs: int = -1,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> Tuple[float, Tuple[float, float]]:
     """
     Compute confidence interval for proxy reliability score using bootstrap.
@@ -157,44 +201,51 @@ def compute_proxy_reliability_confidence(
         long_metric: Name of long-term metric
         n_bootstrap: Number of bootstrap samples
         alpha: Significance level
+        seed: Random seed
+        n_jobs: Worker processes for the bootstrap (joblib semantics, -1 = all
+            cores); results do not depend on it
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
     
     Returns:
         Tuple of (reliability_score, (ci_lower, ci_upper))
     """
-    from proxima.models.baseline import score_proxies
+    from proxima.models.baseline import (
+        EARLY_METRICS, _resolve_deltas, _score_from_deltas, _segment_deltas
+    )
+    
+    # Experiment- and segment-level effects, aggregated from the rows once;
+    # every bootstrap sample below is scored from a subset of them
+    metrics = ["long_retained", *EARLY_METRICS]
+    exp_deltas = _resolve_deltas(df, metrics, exp_effects)
+    seg_deltas = _segment_deltas(df, metrics, ["region", "device", "tenure"])
     
     # Original reliability score
-    details, _ = score_proxies(df)
+    details, _ = _score_from_deltas(exp_deltas, seg_deltas)
     original_score = details[details['metric'] == proxy_metric]['reliability'].values[0]
     
-    # Bootstrap
-    bootstrap_scores = []
-    n_experiments = df['exp_id'].nunique()
+    # Bootstrap: every replicate gets its own child seed, so the samples are
+    # the same however the replicates are split across workers
+    seeds = np.random.SeedSequence(seed).spawn(n_bootstrap)
+    exp_ids = df['exp_id'].unique()
     
-    for _ in range(n_bootstrap):
-        # Resample experiments with replacement
-        sampled_exp_ids = np.random.choice(
-            df['exp_id'].unique(),
-            size=n_experiments,
-            replace=True
+    n_workers = min(effective_n_jobs(n_jobs), n_bootstrap)
+    if n_workers <= 1:
+        scores, ok = _bootstrap_reliabilities(exp_deltas, seg_deltas, exp_ids, proxy_metric, seeds)
+    else:
+        # One contiguous block of replicates per worker
+        blocks = np.array_split(np.arange(n_bootstrap), n_workers)
+        results = Parallel(n_jobs=n_workers)(
+            delayed(_bootstrap_reliabilities)(
+                exp_deltas, seg_deltas, exp_ids, proxy_metric, [seeds[i] for i in block]
+            )
+            for block in blocks
         )
-        
-        # Create bootstrap sample
-        bootstrap_df = pd.concat([
-            df[df['exp_id'] == exp_id] for exp_id in sampled_exp_ids
-        ], ignore_index=True)
-        
-        # Compute reliability
-        try:
-            boot_details, _ = score_proxies(bootstrap_df)
-            boot_score = boot_details[boot_details['metric'] == proxy_metric]['reliability'].values[0]
-            bootstrap_scores.append(boot_score)
-        except:
-            continue
+        scores = np.concatenate([block_scores for block_scores, _ in results])
+        ok = np.concatenate([block_ok for _, block_ok in results])
     
-    # Compute confidence interval
-    ci_lower = np.percentile(bootstrap_scores, alpha/2 * 100)
-    ci_upper = np.percentile(bootstrap_scores, (1 - alpha/2) * 100)
+    # Compute confidence interval over the samples that could be scored
+    ci_lower, ci_upper = np.quantile(scores[ok], [alpha/2, 1 - alpha/2])
     
     return original_score, (ci_lower, ci_upper)
 
@@ -204,7 +255,8 @@ def test_proxy_superiority(
     proxy1: str,
     proxy2: str,
     long_metric: str = "long_retained",
-    alpha: float = 0.05
+    alpha: float = 0.05,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> dict:
     """
     Test if one proxy is significantly better than another.
@@ -217,36 +269,35 @@ def test_proxy_superiority(
         proxy2: Second proxy metric
         long_metric: Long-term metric
         alpha: Significance level
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
     
     Returns:
         Dictionary with test results
     """
-    from proxima.models.baseline import compute_diff_in_means_effect
+    from proxima.models.baseline import _resolve_deltas, _same_sign
     
-    # Compute effects
-    long_eff = compute_diff_in_means_effect(df, long_metric).set_index("exp_id")
-    proxy1_eff = compute_diff_in_means_effect(df, proxy1).set_index("exp_id")
-    proxy2_eff = compute_diff_in_means_effect(df, proxy2).set_index("exp_id")
+    # Compute effects of all three metrics in one pass (or reuse them)
+    effects = _resolve_deltas(df, list(dict.fromkeys([long_metric, proxy1, proxy2])), exp_effects)
     
-    # Align
-    aligned = pd.concat([long_eff, proxy1_eff, proxy2_eff], axis=1, join="inner")
-    aligned.columns = ['long', 'proxy1', 'proxy2']
+    # Align (rows share the exp_id index, so plain arrays from here on)
+    long_eff, proxy1_eff, proxy2_eff = effects[[long_metric, proxy1, proxy2]].to_numpy(dtype=np.float64).T
     
     # Directional accuracy
-    proxy1_correct = (np.sign(aligned['long']) == np.sign(aligned['proxy1']))
-    proxy2_correct = (np.sign(aligned['long']) == np.sign(aligned['proxy2']))
+    proxy1_correct = _same_sign(long_eff, proxy1_eff)
+    proxy2_correct = _same_sign(long_eff, proxy2_eff)
     
     # McNemar's test
     # Contingency table: [both_correct, proxy1_only, proxy2_only, both_wrong]
-    both_correct = (proxy1_correct & proxy2_correct).sum()
-    proxy1_only = (proxy1_correct & ~proxy2_correct).sum()
-    proxy2_only = (~proxy1_correct & proxy2_correct).sum()
-    both_wrong = (~proxy1_correct & ~proxy2_correct).sum()
+    both_correct = np.count_nonzero(proxy1_correct & proxy2_correct)
+    proxy1_only = np.count_nonzero(proxy1_correct & ~proxy2_correct)
+    proxy2_only = np.count_nonzero(~proxy1_correct & proxy2_correct)
+    both_wrong = np.count_nonzero(~proxy1_correct & ~proxy2_correct)
     
     # McNemar statistic
     if proxy1_only + proxy2_only > 0:
         mcnemar_stat = (abs(proxy1_only - proxy2_only) - 1)**2 / (proxy1_only + proxy2_only)
-        p_value = 1 - stats.chi2.cdf(mcnemar_stat, df=1)
+        p_value = 1 - special.chdtr(1, mcnemar_stat)
     else:
         mcnemar_stat = 0
         p_value = 1.0
@@ -8,14 +8,49 @@ This generator intentionally creates:
 """
 
 from __future__ import annotations
+import math
 import numpy as np
 import pandas as pd
 from typing import Optional
+from scipy.special import expit
+
+from proxima._numba import NUMBA_AVAILABLE, NUMBA_WARMUP, njit, prange
+
+
+# Compiled eagerly at import under NUMBA_WARMUP; sigmoid always passes
+# contiguous float64 views
+_SIGMOID_SIGNATURES = ["void(float64[::1], float64[::1])"]
+_SIGMOID_OPTIONS = dict(parallel=True, cache=True)
+
+
+@(njit(_SIGMOID_SIGNATURES, **_SIGMOID_OPTIONS) if NUMBA_WARMUP else njit(**_SIGMOID_OPTIONS))
+def _sigmoid_kernel(x: np.ndarray, out: np.ndarray) -> None:
+    """Clip-and-logistic in one pass, writing into out."""
+    for i in prange(x.shape[0]):
+        v = min(max(x[i], -500.0), 500.0)
+        out[i] = 1.0 / (1.0 + math.exp(-v))
 
 
 def sigmoid(x: np.ndarray) -> np.ndarray:
     """Numerically stable sigmoid function."""
-    return 1.0 / (1.0 + np.exp(-np.clip(x, -500, 500)))
+    if NUMBA_AVAILABLE:
+        # Contiguous input so reshape(-1) gives views: the kernel writes
+        # straight into out whatever the caller's memory order (scalars
+        # come back from ascontiguousarray as shape (1,))
+        arr = np.ascontiguousarray(x, dtype=np.float64)
+        out = np.empty(arr.shape)
+        _sigmoid_kernel(arr.reshape(-1), out.reshape(-1))
+        return float(out[0]) if np.ndim(x) == 0 else out
+    # expit is a single stable C loop: no clip or exp temporaries needed
+    return expit(x)
+
+
+def _sorted_categorical(idx: np.ndarray, labels: np.ndarray) -> pd.Categorical:
+    """Categorical of labels[idx] with sorted categories, built from the indices."""
+    order = np.argsort(labels)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(labels))
+    return pd.Categorical.from_codes(rank[idx], categories=labels[order])
 
 
 def generate_synthetic_experiments(
@@ -40,12 +75,12 @@ def generate_synthetic_experiments(
     
     Returns:
         DataFrame with columns:
-            - exp_id: experiment identifier
-            - region, device, tenure: segment attributes
-            - treatment: binary treatment assignment (0=control, 1=treatment)
-            - early_watch_min, early_starts, early_ctr, rebuffer_rate: early metrics
-            - long_retained: long-term binary outcome
-            - failure_cohort: indicator for intentionally problematic segment
+            - exp_id: experiment identifier (smallest fitting unsigned int)
+            - region, device, tenure: segment attributes (categorical)
+            - treatment: binary treatment assignment (0=control, 1=treatment; int8)
+            - early_watch_min, early_starts, early_ctr, rebuffer_rate: early metrics (float32)
+            - long_retained: long-term binary outcome (int8)
+            - failure_cohort: indicator for intentionally problematic segment (int8)
     """
     rng = np.random.default_rng(seed)
 
@@ -57,34 +92,36 @@ def generate_synthetic_experiments(
     # Sample experiment ids
     exp_id = rng.integers(0, n_experiments, size=n_users)
 
-    # Sample segments
-    region = rng.choice(regions, size=n_users, p=[0.35, 0.20, 0.25, 0.20])
-    device = rng.choice(devices, size=n_users, p=[0.45, 0.45, 0.10])
-    tenure = rng.choice(tenures, size=n_users, p=[0.30, 0.70])
+    # Sample segments as indices into the segment spaces (the same draws as
+    # sampling the labels directly)
+    region_idx = rng.choice(len(regions), size=n_users, p=[0.35, 0.20, 0.25, 0.20])
+    device_idx = rng.choice(len(devices), size=n_users, p=[0.45, 0.45, 0.10])
+    tenure_idx = rng.choice(len(tenures), size=n_users, p=[0.30, 0.70])
 
     # Treatment assignment (50/50 randomized within each experiment)
     treatment = rng.integers(0, 2, size=n_users)
 
-    # Build segment embeddings (simple numeric encodings)
-    region_w = pd.Series(region).map({"NA": 0.2, "LATAM": -0.1, "EU": 0.05, "IN": -0.15}).to_numpy()
-    device_w = pd.Series(device).map({"TV": 0.25, "Mobile": -0.05, "Desktop": 0.0}).to_numpy()
-    tenure_w = pd.Series(tenure).map({"New": -0.1, "Existing": 0.1}).to_numpy()
+    # Build segment embeddings (simple numeric encodings), gathered from
+    # per-segment lookup tables aligned with the segment spaces
+    region_w = np.array([0.2, -0.1, 0.05, -0.15])[region_idx]
+    device_w = np.array([0.25, -0.05, 0.0])[device_idx]
+    tenure_w = np.array([-0.1, 0.1])[tenure_idx]
 
     # Experiment-level base treatment effect (heterogeneous across experiments)
     exp_tau = rng.normal(0.0, 0.12, size=n_experiments)  # long-term uplift tendency
     exp_bias = rng.normal(0.0, 0.08, size=n_experiments)  # baseline shift per experiment
 
-    # Segment interaction with treatment (heterogeneous treatment effects)
+    # Segment interaction with treatment (heterogeneous treatment effects):
+    # TV +0.06, Mobile -0.05, IN -0.03, Existing +0.03
     seg_tau = (
-        0.06 * (device == "TV").astype(float)
-        - 0.05 * (device == "Mobile").astype(float)
-        - 0.03 * (region == "IN").astype(float)
-        + 0.03 * (tenure == "Existing").astype(float)
+        np.array([0.06, -0.05, 0.0])[device_idx]
+        + np.array([0.0, 0.0, 0.0, -0.03])[region_idx]
+        + np.array([0.0, 0.03])[tenure_idx]
     )
 
     # Inject a "proxy failure" cohort:
     # For Mobile + IN + New, treatment increases early engagement but hurts long-term retention.
-    failure_cohort = ((device == "Mobile") & (region == "IN") & (tenure == "New"))
+    failure_cohort = (device_idx == 1) & (region_idx == 3) & (tenure_idx == 0)
     failure_long_penalty = -0.25
 
     # Latent user "satisfaction" and "engagement propensity"
@@ -105,7 +142,9 @@ def generate_synthetic_experiments(
 
     long_logit = base_logit + treatment * tau_long
     long_prob = sigmoid(long_logit)
-    long_retained = rng.binomial(1, long_prob, size=n_users)
+    # Bernoulli draws as one uniform compare (binomial's general sampler is
+    # several times slower for n=1)
+    long_retained = rng.random(n_users, dtype=np.float32) < long_prob
 
     # Early metrics: watch_time_1d, starts_1d, ctr_1d, rebuffer_rate_1d
     noise = rng.normal(0.0, 1.0, size=n_users)
@@ -134,30 +173,36 @@ def generate_synthetic_experiments(
 
     # CTR proxy: can be "gamed"
     ctr_base = sigmoid(0.3 * user_eng - 0.35 * user_sat + 0.1 * rng.normal(0, 1, size=n_users))
-    early_ctr = ctr_base + 0.06 * treatment + 0.04 * (device == "Mobile").astype(float) * treatment
+    early_ctr = ctr_base + 0.06 * treatment + np.array([0.0, 0.04, 0.0])[device_idx] * treatment
     early_ctr = np.clip(early_ctr, 0, 1)
 
     # Rebuffer rate: negative QoE metric
     rebuffer_rate = sigmoid(
-        -0.2 * user_sat 
-        + 0.25 * (region == "IN").astype(float) 
-        + 0.15 * (device == "Mobile").astype(float) 
+        -0.2 * user_sat
+        + np.array([0.0, 0.0, 0.0, 0.25])[region_idx]
+        + np.array([0.0, 0.15, 0.0])[device_idx]
         + 0.1 * rng.normal(0, 1, size=n_users)
     )
-    rebuffer_rate = np.clip(rebuffer_rate - 0.03 * treatment * (device == "TV").astype(float), 0, 1)
-
+    rebuffer_rate = np.clip(rebuffer_rate - np.array([0.03, 0.0, 0.0])[device_idx] * treatment, 0, 1)
+
+    # Segments are stored as Categoricals (sorted categories, so groupby output
+    # order matches plain strings): every segment groupby downstream then
+    # hashes small integer codes instead of Python strings. exp_id uses the
+    # smallest unsigned type that fits, binary columns are int8 and the early
+    # metrics float32, which cuts the bytes every aggregation pass has to
+    # stream; effects are still accumulated in float64 downstream.
     df = pd.DataFrame({
-        "exp_id": exp_id,
-        "region": region,
-        "device": device,
-        "tenure": tenure,
-        "treatment": treatment,
-        "early_watch_min": early_watch_min,
-        "early_starts": early_starts,
-        "early_ctr": early_ctr,
-        "rebuffer_rate": rebuffer_rate,
-        "long_retained": long_retained,
-        "failure_cohort": failure_cohort.astype(int),
+        "exp_id": exp_id.astype(np.min_scalar_type(max(n_experiments - 1, 0))),
+        "region": _sorted_categorical(region_idx, regions),
+        "device": _sorted_categorical(device_idx, devices),
+        "tenure": _sorted_categorical(tenure_idx, tenures),
+        "treatment": treatment.astype(np.int8),
+        "early_watch_min": early_watch_min.astype(np.float32),
+        "early_starts": early_starts.astype(np.float32),
+        "early_ctr": early_ctr.astype(np.float32),
+        "rebuffer_rate": rebuffer_rate.astype(np.float32),
+        "long_retained": long_retained.astype(np.int8),
+        "failure_cohort": failure_cohort.astype(np.int8),
     })
 
     return df
@@ -20,6 +20,8 @@ from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score
 
+from proxima._numba import NUMBA_AVAILABLE, NUMBA_WARMUP, njit, prange
+
 EARLY_METRICS = ["early_watch_min", "early_starts", "early_ctr", "rebuffer_rate"]
 
 
@@ -45,13 +47,188 @@ def compute_diff_in_means_effect(df: pd.DataFrame, y_col: str) -> pd.DataFrame:
     Returns:
         DataFrame with columns [exp_id, delta_{y_col}]
     """
-    g = df.groupby(["exp_id", "treatment"])[y_col].mean().unstack()
+    g = df.groupby(["exp_id", "treatment"], observed=True)[y_col].mean().unstack()
     g = g.rename(columns={0: "control_mean", 1: "treat_mean"})
     g["effect"] = g["treat_mean"] - g["control_mean"]
     g = g.reset_index()
     return g[["exp_id", "effect"]].rename(columns={"effect": f"delta_{y_col}"})
 
 
+def _kernel_values(values: np.ndarray) -> np.ndarray:
+    """
+    Outcome matrix in the one layout the kernels are warmed for.
+
+    float32 inputs stay float32 (half the bytes to read); the kernels
+    accumulate in float64 either way. Column-major, since the kernels walk
+    each column top to bottom; frames of same-dtype columns already come
+    out of to_numpy that way, so this is usually a no-op.
+    """
+    if values.dtype.kind != "f":
+        values = values.astype(np.float64)
+    return np.asfortranarray(values)
+
+
+@njit(parallel=True, cache=True, fastmath={"reassoc", "contract"})
+def _exp_deltas_kernel(
+    codes: np.ndarray, n_exp: int, treatment: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    """
+    Treatment-minus-control means per experiment for each column of values.
+
+    codes[i] is the experiment (0..n_exp-1) of row i; rows need not be
+    grouped, each column is accumulated in one pass in row order, columns in
+    parallel. NaNs are skipped like pandas' mean. An experiment missing
+    either arm gets NaN.
+    """
+    n_cols = values.shape[1]
+    out = np.full((n_exp, n_cols), np.nan)
+    for j in prange(n_cols):
+        sums = np.zeros((n_exp, 2))
+        counts = np.zeros((n_exp, 2), dtype=np.int64)
+        for i in range(values.shape[0]):
+            v = values[i, j]
+            arm = treatment[i]
+            if np.isnan(v) or (arm != 0 and arm != 1):
+                continue
+            sums[codes[i], arm] += v
+            counts[codes[i], arm] += 1
+        for e in range(n_exp):
+            if counts[e, 0] > 0 and counts[e, 1] > 0:
+                out[e, j] = sums[e, 1] / counts[e, 1] - sums[e, 0] / counts[e, 0]
+    return out
+
+
+@njit(parallel=True, cache=True, fastmath={"reassoc", "contract"})
+def _arm_means_kernel(treatment: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Control (row 0) and treatment (row 1) means for each column of values.
+
+    One pass over the rows per column, columns in parallel. NaNs are skipped
+    like pandas' mean; an empty arm gives NaN.
+    """
+    n_cols = values.shape[1]
+    out = np.full((2, n_cols), np.nan)
+    for j in prange(n_cols):
+        sum_t = 0.0
+        sum_c = 0.0
+        n_t = 0
+        n_c = 0
+        for i in range(values.shape[0]):
+            v = values[i, j]
+            if np.isnan(v):
+                continue
+            if treatment[i] == 1:
+                sum_t += v
+                n_t += 1
+            elif treatment[i] == 0:
+                sum_c += v
+                n_c += 1
+        if n_c > 0:
+            out[0, j] = sum_c / n_c
+        if n_t > 0:
+            out[1, j] = sum_t / n_t
+    return out
+
+
+def compute_overall_effect(df: pd.DataFrame, y_cols: List[str]) -> pd.DataFrame:
+    """
+    Pooled difference in means across all experiments:
+      effect = mean(y|t=1) - mean(y|t=0)
+
+    Args:
+        df: DataFrame with columns [treatment, *y_cols]
+        y_cols: Outcome column names
+
+    Returns:
+        DataFrame indexed by outcome with columns [control_mean, treat_mean, effect]
+    """
+    if NUMBA_AVAILABLE:
+        values = _kernel_values(df[y_cols].to_numpy())
+        means = _arm_means_kernel(df["treatment"].to_numpy(dtype=np.int8), values)
+        out = pd.DataFrame(
+            {"control_mean": means[0], "treat_mean": means[1]}, index=pd.Index(y_cols)
+        )
+    else:
+        # Metrics may be stored as float32; average in float64 like the kernel
+        g = df[y_cols].astype(np.float64).groupby(df["treatment"], observed=True).mean()
+        out = pd.DataFrame({"control_mean": g.loc[0], "treat_mean": g.loc[1]})
+    out["effect"] = out["treat_mean"] - out["control_mean"]
+    return out
+
+
+def _experiment_deltas(df: pd.DataFrame, y_cols: List[str]) -> pd.DataFrame:
+    """
+    Experiment-level difference-in-means for several outcome columns at once.
+
+    Uses the Numba kernel when available, otherwise a single pandas groupby.
+
+    Returns:
+        DataFrame indexed by exp_id with one column of effects per y_col
+    """
+    if NUMBA_AVAILABLE:
+        exp_codes, exp_ids = pd.factorize(df["exp_id"], sort=True)
+        values = _kernel_values(df[y_cols].to_numpy())
+        deltas = _exp_deltas_kernel(
+            exp_codes, len(exp_ids), df["treatment"].to_numpy(dtype=np.int8), values
+        )
+        return pd.DataFrame(deltas, index=pd.Index(exp_ids, name="exp_id"), columns=y_cols)
+
+    # Metrics may be stored as float32; average in float64 like the kernel
+    g = df[y_cols].astype(np.float64).groupby(
+        [df["exp_id"], df["treatment"]], observed=True
+    ).mean()
+    return g.xs(1, level="treatment") - g.xs(0, level="treatment")
+
+
+def _resolve_deltas(
+    df: pd.DataFrame,
+    y_cols: List[str],
+    exp_effects: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Experiment-level effects for y_cols: the matching columns of exp_effects
+    when given, otherwise computed from df.
+    """
+    if exp_effects is None:
+        return _experiment_deltas(df, y_cols)
+    return exp_effects[y_cols]
+
+
+def _same_sign(a, b) -> np.ndarray:
+    """
+    Elementwise sign agreement of a and b, read off the IEEE sign bits.
+
+    One XOR over bool arrays instead of two np.sign passes and a float
+    compare. Zeros count by their sign bit (so +0 agrees with positive
+    deltas rather than disagreeing with everything), and a NaN on either
+    side never agrees.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return ~(np.signbit(a) ^ np.signbit(b)) & ~np.isnan(a + b)
+
+
+def _prewarm_kernels() -> None:
+    """
+    Compile (or load from cache) the Numba kernels on tiny inputs.
+
+    Covers every signature _kernel_values can produce: float32 and float64,
+    and both a single column (which Numba types as C-contiguous) and several
+    (Fortran-ordered).
+    """
+    codes = np.array([0, 0])
+    treatment = np.array([0, 1], dtype=np.int8)
+    for dtype in (np.float64, np.float32):
+        for n_cols in (1, 2):
+            values = np.zeros((2, n_cols), dtype=dtype, order="F")
+            _exp_deltas_kernel(codes, 1, treatment, values)
+            _arm_means_kernel(treatment, values)
+
+
+if NUMBA_WARMUP:
+    _prewarm_kernels()
+
+
 def compute_segment_effects(
     df: pd.DataFrame, 
     y_col: str, 
@@ -68,13 +245,69 @@ def compute_segment_effects(
     Returns:
         DataFrame with segment-level treatment effects
     """
-    g = df.groupby(["exp_id", *segment_cols, "treatment"])[y_col].mean().unstack()
+    g = df.groupby(["exp_id", *segment_cols, "treatment"], observed=True)[y_col].mean().unstack()
     g = g.rename(columns={0: "control_mean", 1: "treat_mean"})
     g["effect"] = g["treat_mean"] - g["control_mean"]
     g = g.reset_index()
     return g[["exp_id", *segment_cols, "effect"]].rename(columns={"effect": f"delta_{y_col}"})
 
 
+def _key_codes(col: pd.Series) -> Tuple[np.ndarray, pd.Categorical | pd.Index]:
+    """
+    Integer codes of a grouping column (-1 for missing) and the labels they
+    index. Categorical columns reuse their codes and keep their dtype.
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy(), pd.Categorical(col.cat.categories, dtype=col.dtype)
+    return pd.factorize(col, sort=True)
+
+
+def _segment_deltas(
+    df: pd.DataFrame,
+    y_cols: List[str],
+    segment_cols: List[str]
+) -> pd.DataFrame:
+    """
+    Segment-level effects for several outcome columns from one pass over the rows.
+
+    Equivalent to calling compute_segment_effects once per column and merging
+    on the segment keys, but scans the data once.
+
+    Returns:
+        DataFrame with exp_id, segment columns and one delta_<col> per y_col
+    """
+    keys = ["exp_id", *segment_cols]
+    if NUMBA_AVAILABLE:
+        # Number every (exp_id, *segments) cell and reuse the experiment
+        # kernel with cells in place of experiments: one pass over the rows
+        # per outcome instead of a multi-key groupby
+        codes, labels = zip(*(_key_codes(df[k]) for k in keys))
+        values = df[y_cols].to_numpy()
+        treatment = df["treatment"].to_numpy(dtype=np.int8)
+        keep = np.logical_and.reduce([c >= 0 for c in codes])
+        if not keep.all():
+            # Rows with a missing key are dropped, as in groupby
+            codes = [c[keep] for c in codes]
+            values, treatment = values[keep], treatment[keep]
+        values = _kernel_values(values)
+        flat = np.ravel_multi_index(codes, [len(l) for l in labels])
+        cell_codes, cells = pd.factorize(flat, sort=True)
+        deltas = _exp_deltas_kernel(cell_codes, len(cells), treatment, values)
+        cell_keys = np.unravel_index(cells, [len(l) for l in labels])
+        out = pd.DataFrame({k: l.take(c) for k, l, c in zip(keys, labels, cell_keys)})
+        out[[f"delta_{y}" for y in y_cols]] = deltas
+        return out
+
+    # Cell order is irrelevant here (callers align on the keys or aggregate
+    # again), so skip sorting the groups
+    # Metrics may be stored as float32; average in float64 like the kernel
+    g = df[y_cols].astype(np.float64).groupby(
+        [df[k] for k in [*keys, "treatment"]], observed=True, sort=False
+    ).mean()
+    eff = g.xs(1, level="treatment") - g.xs(0, level="treatment")
+    return eff.add_prefix("delta_").reset_index()
+
+
 def train_long_term_model(df: pd.DataFrame) -> Tuple[Pipeline, float]:
     """
     Simple baseline: logistic regression predicting long_retained from:
@@ -114,7 +347,8 @@ def train_long_term_model(df: pd.DataFrame) -> Tuple[Pipeline, float]:
 
 def score_proxies(
     df: pd.DataFrame, 
-    segment_cols: List[str] = ["region", "device", "tenure"]
+    segment_cols: List[str] = ["region", "device", "tenure"],
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> Tuple[pd.DataFrame, List[ProxyScore]]:
     """
     Scores each early metric as a proxy for long_retained uplift.
@@ -125,46 +359,58 @@ def score_proxies(
     Args:
         df: DataFrame with experiment data
         segment_cols: List of segment column names for fragility detection
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric) to reuse across analyses
     
     Returns:
         Tuple of (details_dataframe, list_of_proxy_scores)
     """
-    # Experiment-level long-term effect
-    long_eff = compute_diff_in_means_effect(df, "long_retained")
+    # Experiment- and segment-level effects for the outcome and every proxy in one pass
+    exp_deltas = _resolve_deltas(df, ["long_retained", *EARLY_METRICS], exp_effects)
+    seg_deltas = _segment_deltas(df, ["long_retained", *EARLY_METRICS], segment_cols)
+    return _score_from_deltas(exp_deltas, seg_deltas)
+
+
+def _score_from_deltas(
+    exp_deltas: pd.DataFrame,
+    seg_deltas: pd.DataFrame
+) -> Tuple[pd.DataFrame, List[ProxyScore]]:
+    """
+    score_proxies from precomputed effects: exp_deltas indexed by exp_id with
+    one column per metric, seg_deltas as returned by _segment_deltas.
 
+    The scores only depend on the data through these effects, so a subset of
+    experiments can be scored by passing the matching rows of both.
+    """
     proxy_scores: List[ProxyScore] = []
     details_rows = []
 
-    # Precompute global long-term sign per experiment
-    long_by_exp = long_eff.set_index("exp_id")["delta_long_retained"]
+    # Global long-term effect per experiment, broadcast to every segment cell
+    # once; each proxy below only compares its own cell signs against it
+    long_by_exp = exp_deltas["long_retained"]
+    global_long = seg_deltas["exp_id"].map(long_by_exp).to_numpy()
 
     for m in EARLY_METRICS:
-        m_eff = compute_diff_in_means_effect(df, m).set_index("exp_id")[f"delta_{m}"]
-
-        # Align
-        aligned = pd.concat([long_by_exp, m_eff], axis=1, join="inner").dropna()
-        aligned.columns = ["delta_long", "delta_proxy"]
+        # Align (plain arrays from here on: this loop runs once per bootstrap
+        # replicate, so pandas alignment overhead adds up)
+        aligned = exp_deltas[["long_retained", m]].dropna().to_numpy(dtype=np.float64)
+        delta_long, delta_proxy = aligned[:, 0], aligned[:, 1]
 
-        # effect correlation
-        if aligned["delta_proxy"].std() < 1e-12 or aligned["delta_long"].std() < 1e-12:
+        # effect correlation (Pearson, as Series.corr)
+        if len(aligned) < 2 or delta_proxy.std(ddof=1) < 1e-12 or delta_long.std(ddof=1) < 1e-12:
             corr = 0.0
         else:
-            corr = float(aligned["delta_proxy"].corr(aligned["delta_long"]))
+            dp = delta_proxy - delta_proxy.mean()
+            dl = delta_long - delta_long.mean()
+            corr = float(dp @ dl / np.sqrt((dp @ dp) * (dl @ dl)))
 
         # directional accuracy (sign match)
-        dir_acc = float((np.sign(aligned["delta_proxy"]) == np.sign(aligned["delta_long"])).mean())
+        dir_acc = float(_same_sign(delta_proxy, delta_long).mean())
 
         # fragility: segment-level sign flips
-        seg_long = compute_segment_effects(df, "long_retained", segment_cols)
-        seg_proxy = compute_segment_effects(df, m, segment_cols)
-
-        seg = seg_long.merge(seg_proxy, on=["exp_id", *segment_cols], how="inner", suffixes=("_long", "_proxy"))
-        # attach global signs
-        seg["global_long_sign"] = np.sign(seg["exp_id"].map(long_by_exp))
-        seg["proxy_sign"] = np.sign(seg[f"delta_{m}"])
         # "flip" if proxy suggests opposite direction than global long-term
-        seg["flip"] = (seg["proxy_sign"] != seg["global_long_sign"]).astype(int)
-        fragility_rate = float(seg["flip"].mean())
+        flip = ~_same_sign(seg_deltas[f"delta_{m}"], global_long)
+        fragility_rate = float(flip.mean())
 
         # Reliability composite (normalize corr to [0,1] via (corr+1)/2)
         corr01 = (corr + 1.0) / 2.0
@@ -195,7 +441,8 @@ def find_top_fragility_segments(
     df: pd.DataFrame,
     proxy_metric: str,
     segment_cols: List[str] = ["region", "device", "tenure"],
-    min_count: int = 500
+    min_count: int = 500,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> pd.DataFrame:
     """
     Returns segments where proxy sign differs from long-term sign most often.
@@ -205,25 +452,27 @@ def find_top_fragility_segments(
         proxy_metric: Name of the proxy metric to analyze
         segment_cols: List of segment column names
         min_count: Minimum number of users per segment to include
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
 
     Returns:
         DataFrame with fragile segments ranked by flip_rate
     """
-    long_eff = compute_diff_in_means_effect(df, "long_retained").set_index("exp_id")["delta_long_retained"]
-    seg_long = compute_segment_effects(df, "long_retained", segment_cols)
-    seg_proxy = compute_segment_effects(df, proxy_metric, segment_cols)
-    seg = seg_long.merge(seg_proxy, on=["exp_id", *segment_cols], how="inner")
+    long_eff = _resolve_deltas(df, ["long_retained"], exp_effects)["long_retained"]
+
+    # Segment means and cell sizes for both metrics from a single groupby
+    y_cols = list(dict.fromkeys(["long_retained", proxy_metric]))
+    grouped = df.groupby(["exp_id", *segment_cols, "treatment"], observed=True, sort=False)
+    means = grouped[y_cols].mean()
+    seg = (means.xs(1, level="treatment") - means.xs(0, level="treatment")).add_prefix("delta_")
+    seg["n"] = grouped.size().groupby(level=["exp_id", *segment_cols], observed=True, sort=False).sum()
+    seg = seg.reset_index()
 
-    seg["global_long_sign"] = np.sign(seg["exp_id"].map(long_eff))
-    seg["proxy_sign"] = np.sign(seg[f"delta_{proxy_metric}"])
-    seg["flip"] = (seg["proxy_sign"] != seg["global_long_sign"]).astype(int)
+    seg["flip"] = (~_same_sign(seg[f"delta_{proxy_metric}"], seg["exp_id"].map(long_eff))).astype(int)
 
-    # count users per (exp, segment) for filtering
-    counts = df.groupby(["exp_id", *segment_cols]).size().reset_index(name="n")
-    seg = seg.merge(counts, on=["exp_id", *segment_cols], how="inner")
     seg = seg[seg["n"] >= min_count]
 
-    out = seg.groupby(segment_cols).agg(
+    out = seg.groupby(segment_cols, observed=True).agg(
         flip_rate=("flip", "mean"),
         n_cells=("flip", "size"),
         avg_cell_n=("n", "mean"),
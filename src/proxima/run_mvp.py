@@ -8,11 +8,20 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine, ``pip install proxima[data]``)
+
+    PARQUET_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    PARQUET_AVAILABLE = False
+
 from proxima.generator.simulate import generate_synthetic_experiments
 from proxima.models.baseline import (
     train_long_term_model,
     score_proxies,
     find_top_fragility_segments,
+    _experiment_deltas,
     EARLY_METRICS
 )
 from proxima.evaluation.decision_sim import compare_decision_strategies
@@ -57,9 +66,14 @@ def main(
     
     df = generate_synthetic_experiments(n_users=n_users, n_experiments=n_experiments, seed=seed)
     
-    # Save data
-    data_path = output_path / "synthetic_data.csv"
-    df.to_csv(data_path, index=False)
+    # Save data: typed, compressed Parquet when pyarrow is installed (much
+    # smaller and faster to write and reload than text), CSV otherwise
+    if PARQUET_AVAILABLE:
+        data_path = output_path / "synthetic_data.parquet"
+        df.to_parquet(data_path, engine="pyarrow", compression="zstd", index=False)
+    else:
+        data_path = output_path / "synthetic_data.csv"
+        df.to_csv(data_path, index=False)
     print(f"  ✓ Data saved to {data_path}")
     print(f"  - Shape: {df.shape}")
     print(f"  - Failure cohort size: {df['failure_cohort'].sum():,} ({df['failure_cohort'].mean():.1%})")
@@ -72,7 +86,10 @@ def main(
     
     # 3. Score proxies
     print(f"\n[3/6] Scoring proxy metrics...")
-    details, proxy_scores = score_proxies(df)
+    # Experiment-level effects of every metric, computed once and shared by
+    # the scoring, fragility and decision steps below
+    exp_effects = _experiment_deltas(df, ["long_retained", *EARLY_METRICS])
+    details, proxy_scores = score_proxies(df, exp_effects=exp_effects)
     print(f"  ✓ Proxy scoring complete")
     print("\n" + "=" * 80)
     print("PROXY RELIABILITY RANKING")
@@ -88,7 +105,7 @@ def main(
     # 4. Find fragile segments
     print(f"\n[4/6] Detecting fragile segments...")
     top_metric = details.iloc[0]["metric"]
-    frag = find_top_fragility_segments(df, top_metric, min_count=400)
+    frag = find_top_fragility_segments(df, top_metric, min_count=400, exp_effects=exp_effects)
     print(f"\n  Most fragile segments for '{top_metric}':")
     print(frag.head(10).to_string(index=False))
     
@@ -98,7 +115,7 @@ def main(
     
     # 5. Decision simulation
     print(f"\n[5/6] Running decision simulation...")
-    decision_results = compare_decision_strategies(df, EARLY_METRICS)
+    decision_results = compare_decision_strategies(df, EARLY_METRICS, exp_effects=exp_effects)
     print("\n" + "=" * 80)
     print("DECISION SIMULATION RESULTS")
     print("=" * 80)
@@ -109,25 +126,28 @@ def main(
     decision_results.to_csv(decision_path, index=False)
     print(f"\n  ✓ Decision results saved to {decision_path}")
     
-    # 6. Generate visualizations
+    # 6. Generate visualizations (quick-look resolution; the plot helpers
+    # default to 300 dpi for publication figures)
     print(f"\n[6/6] Generating visualizations...")
     
     # Reliability comparison
-    plot_reliability_comparison(details, save_path=figures_path / "reliability_comparison.png", show=False)
+    plot_reliability_comparison(details, save_path=figures_path / "reliability_comparison.png", show=False, dpi=150)
     print(f"  ✓ Reliability comparison plot saved")
     
     # All proxy correlations
-    plot_all_proxy_correlations(df, EARLY_METRICS, save_path=figures_path / "proxy_correlations.png", show=False)
+    plot_all_proxy_correlations(df, EARLY_METRICS, save_path=figures_path / "proxy_correlations.png", show=False, dpi=150,
+                                exp_effects=exp_effects)
     print(f"  ✓ Proxy correlation plots saved")
     
     # Fragility heatmap
     plot_fragility_heatmap(df, top_metric, segment_cols=["region", "device"], 
-                          save_path=figures_path / f"fragility_heatmap_{top_metric}.png", show=False)
+                          save_path=figures_path / f"fragility_heatmap_{top_metric}.png", show=False, dpi=150,
+                          exp_effects=exp_effects)
     print(f"  ✓ Fragility heatmap saved")
     
     # Decision simulation results
     plot_decision_simulation_results(decision_results, 
-                                    save_path=figures_path / "decision_simulation.png", show=False)
+                                    save_path=figures_path / "decision_simulation.png", show=False, dpi=150)
     print(f"  ✓ Decision simulation plots saved")
     
     print("\n" + "=" * 80)
@@ -142,7 +162,8 @@ def main(
     print("\n")
 
 
-if __name__ == "__main__":
+def cli():
+    """Command-line entry point (installed as ``proxima-mvp``)."""
     parser = argparse.ArgumentParser(description="Run PROXIMA MVP pipeline")
     parser.add_argument("--n-users", type=int, default=250_000, help="Number of users to generate")
     parser.add_argument("--n-experiments", type=int, default=50, help="Number of experiments")
@@ -152,3 +173,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
     main(args.n_users, args.n_experiments, args.seed, args.output_dir)
 
+
+if __name__ == "__main__":
+    cli()
+
@@ -27,13 +27,48 @@ plt.rcParams['xtick.labelsize'] = 9
 plt.rcParams['ytick.labelsize'] = 9
 plt.rcParams['legend.fontsize'] = 9
 
+# Above this many experiments, effect scatters are drawn as hexbin densities:
+# per-marker drawing (with edges) grows linearly with the point count, while
+# binning stays roughly constant (~0.2s vs ~7s to save 500k points at 300 dpi)
+DENSE_SCATTER_MIN_POINTS = 2000
+
+# Fragility heatmaps with more cells than this are drawn as a plain image
+# without per-cell annotations
+HEATMAP_ANNOTATE_MAX_CELLS = 200
+
+
+def _scatter_effects(ax: plt.Axes, x: np.ndarray, y: np.ndarray, size: float) -> None:
+    """Scatter of per-experiment effects, or a hexbin density for large grids."""
+    if len(x) >= DENSE_SCATTER_MIN_POINTS:
+        hb = ax.hexbin(x, y, gridsize=60, mincnt=1, cmap='Blues')
+        ax.figure.colorbar(hb, ax=ax, label='Experiments')
+        return
+    # Rasterized so vector outputs (PDF/SVG) embed one bitmap, not a path per point
+    ax.scatter(x, y, alpha=0.6, s=size, edgecolors='black', linewidths=0.5, rasterized=True)
+
+
+def _fit_line(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    End points of the least-squares line of y on x over the range of x.
+
+    Closed-form slope/intercept (no Vandermonde lstsq as in np.polyfit), and
+    a straight line only needs its two ends.
+    """
+    dx = x - x.mean()
+    slope = (dx @ (y - y.mean())) / (dx @ dx)
+    intercept = y.mean() - slope * x.mean()
+    x_ends = np.array([x.min(), x.max()])
+    return x_ends, intercept + slope * x_ends
+
 
 def plot_proxy_correlation(
     df: pd.DataFrame,
     proxy_metric: str,
     long_metric: str = "long_retained",
     save_path: Optional[Path] = None,
-    show: bool = True
+    show: bool = True,
+    dpi: int = 300,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> plt.Figure:
     """
     Scatter plot of proxy effect vs long-term effect across experiments.
@@ -44,37 +79,32 @@ def plot_proxy_correlation(
         long_metric: Name of long-term metric
         save_path: Optional path to save figure
         show: Whether to display the plot
+        dpi: Resolution of the saved figure (lower saves faster)
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
     
     Returns:
         matplotlib Figure object
     """
-    from proxima.models.baseline import compute_diff_in_means_effect
-    
-    # Compute effects
-    long_eff = compute_diff_in_means_effect(df, long_metric)
-    proxy_eff = compute_diff_in_means_effect(df, proxy_metric)
+    from proxima.models.baseline import _resolve_deltas
     
-    effects = long_eff.merge(proxy_eff, on="exp_id")
+    # Compute effects (or reuse them)
+    metrics = list(dict.fromkeys([long_metric, proxy_metric]))
+    effects = _resolve_deltas(df, metrics, exp_effects).add_prefix("delta_")
+    x = effects[f"delta_{proxy_metric}"].to_numpy(dtype=np.float64)
+    y = effects[f"delta_{long_metric}"].to_numpy(dtype=np.float64)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
     
     # Create plot
     fig, ax = plt.subplots(figsize=(8, 6))
     
     # Scatter plot
-    ax.scatter(
-        effects[f"delta_{proxy_metric}"],
-        effects[f"delta_{long_metric}"],
-        alpha=0.6,
-        s=80,
-        edgecolors='black',
-        linewidths=0.5
-    )
+    _scatter_effects(ax, x, y, size=80)
     
     # Add regression line
-    z = np.polyfit(effects[f"delta_{proxy_metric}"], effects[f"delta_{long_metric}"], 1)
-    p = np.poly1d(z)
-    x_line = np.linspace(effects[f"delta_{proxy_metric}"].min(), 
-                         effects[f"delta_{proxy_metric}"].max(), 100)
-    ax.plot(x_line, p(x_line), "r--", alpha=0.8, linewidth=2, label='Linear fit')
+    x_line, y_line = _fit_line(x, y)
+    ax.plot(x_line, y_line, "r--", alpha=0.8, linewidth=2, label='Linear fit')
     
     # Add diagonal reference line (perfect correlation)
     lims = [
@@ -84,7 +114,7 @@ def plot_proxy_correlation(
     ax.plot(lims, lims, 'k-', alpha=0.3, zorder=0, linewidth=1, label='Perfect correlation')
     
     # Compute correlation
-    corr = effects[f"delta_{proxy_metric}"].corr(effects[f"delta_{long_metric}"])
+    corr = np.corrcoef(x, y)[0, 1]
     
     # Labels and title
     ax.set_xlabel(f'Proxy Effect: {proxy_metric}', fontweight='bold')
@@ -100,7 +130,7 @@ def plot_proxy_correlation(
     plt.tight_layout()
     
     if save_path:
-        fig.savefig(save_path, bbox_inches='tight', dpi=300)
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
     
     if show:
         plt.show()
@@ -113,7 +143,8 @@ def plot_proxy_correlation(
 def plot_reliability_comparison(
     proxy_scores_df: pd.DataFrame,
     save_path: Optional[Path] = None,
-    show: bool = True
+    show: bool = True,
+    dpi: int = 300
 ) -> plt.Figure:
     """
     Bar chart comparing reliability scores across proxy metrics.
@@ -122,6 +153,7 @@ def plot_reliability_comparison(
         proxy_scores_df: DataFrame from score_proxies() with reliability metrics
         save_path: Optional path to save figure
         show: Whether to display the plot
+        dpi: Resolution of the saved figure (lower saves faster)
     
     Returns:
         matplotlib Figure object
@@ -132,13 +164,11 @@ def plot_reliability_comparison(
     df_sorted = proxy_scores_df.sort_values('reliability', ascending=True)
     
     # Create horizontal bar chart
+    reliability = df_sorted['reliability'].to_numpy()
     y_pos = np.arange(len(df_sorted))
-    bars = ax.barh(y_pos, df_sorted['reliability'], alpha=0.8, edgecolor='black', linewidth=1.2)
-    
-    # Color bars by reliability score
-    colors = plt.cm.RdYlGn(df_sorted['reliability'])
-    for bar, color in zip(bars, colors):
-        bar.set_color(color)
+    # Color bars by reliability score (passed to barh, not set per bar)
+    colors = plt.cm.RdYlGn(reliability)
+    ax.barh(y_pos, reliability, alpha=0.8, color=colors, edgecolor=colors, linewidth=1.2)
     
     ax.set_yticks(y_pos)
     ax.set_yticklabels(df_sorted['metric'])
@@ -148,14 +178,14 @@ def plot_reliability_comparison(
     ax.grid(True, alpha=0.3, axis='x', linestyle='--')
     
     # Add value labels
-    for i, (idx, row) in enumerate(df_sorted.iterrows()):
-        ax.text(row['reliability'] + 0.02, i, f"{row['reliability']:.3f}", 
-                va='center', fontsize=9, fontweight='bold')
+    label_kw = dict(va='center', fontsize=9, fontweight='bold')
+    for i, val in enumerate(reliability):
+        ax.text(val + 0.02, i, f"{val:.3f}", **label_kw)
     
     plt.tight_layout()
     
     if save_path:
-        fig.savefig(save_path, bbox_inches='tight', dpi=300)
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
     
     if show:
         plt.show()
@@ -170,7 +200,9 @@ def plot_fragility_heatmap(
     proxy_metric: str,
     segment_cols: List[str] = ["region", "device"],
     save_path: Optional[Path] = None,
-    show: bool = True
+    show: bool = True,
+    dpi: int = 300,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> plt.Figure:
     """
     Heatmap showing fragility (sign flip rate) across segments.
@@ -181,46 +213,53 @@ def plot_fragility_heatmap(
         segment_cols: Two segment columns for heatmap axes
         save_path: Optional path to save figure
         show: Whether to display the plot
+        dpi: Resolution of the saved figure (lower saves faster)
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
     
     Returns:
         matplotlib Figure object
     """
-    from proxima.models.baseline import (
-        compute_diff_in_means_effect,
-        compute_segment_effects
-    )
+    from proxima.models.baseline import _resolve_deltas, _same_sign, _segment_deltas
     
     if len(segment_cols) != 2:
         raise ValueError("Heatmap requires exactly 2 segment columns")
     
     # Compute segment-level effects
-    long_eff = compute_diff_in_means_effect(df, "long_retained").set_index("exp_id")["delta_long_retained"]
-    seg_long = compute_segment_effects(df, "long_retained", segment_cols)
-    seg_proxy = compute_segment_effects(df, proxy_metric, segment_cols)
-    
-    seg = seg_long.merge(seg_proxy, on=["exp_id", *segment_cols], how="inner")
-    seg["global_long_sign"] = np.sign(seg["exp_id"].map(long_eff))
-    seg["proxy_sign"] = np.sign(seg[f"delta_{proxy_metric}"])
-    seg["flip"] = (seg["proxy_sign"] != seg["global_long_sign"]).astype(int)
+    long_eff = _resolve_deltas(df, ["long_retained"], exp_effects)["long_retained"]
+    seg = _segment_deltas(df, list(dict.fromkeys(["long_retained", proxy_metric])), segment_cols)
+    # Same flip rule as find_top_fragility_segments
+    seg["flip"] = (~_same_sign(seg[f"delta_{proxy_metric}"], seg["exp_id"].map(long_eff))).astype(int)
     
     # Aggregate flip rate by segments
-    pivot = seg.groupby(segment_cols)["flip"].mean().unstack(fill_value=0)
+    pivot = seg.groupby(segment_cols, observed=True)["flip"].mean().unstack(fill_value=0)
     
     # Create heatmap
     fig, ax = plt.subplots(figsize=(10, 7))
-    sns.heatmap(
-        pivot,
-        annot=True,
-        fmt='.2%',
-        cmap='RdYlGn_r',
-        center=0.5,
-        vmin=0,
-        vmax=1,
-        cbar_kws={'label': 'Sign Flip Rate'},
-        linewidths=0.5,
-        linecolor='gray',
-        ax=ax
-    )
+    if pivot.size <= HEATMAP_ANNOTATE_MAX_CELLS:
+        sns.heatmap(
+            pivot,
+            annot=True,
+            fmt='.2%',
+            cmap='RdYlGn_r',
+            center=0.5,
+            vmin=0,
+            vmax=1,
+            cbar_kws={'label': 'Sign Flip Rate'},
+            linewidths=0.5,
+            linecolor='gray',
+            ax=ax
+        )
+    else:
+        # Large grids: one image instead of a mesh of cells plus a text per
+        # cell, which would be unreadable anyway
+        im = ax.imshow(pivot.to_numpy(), aspect='auto', cmap='RdYlGn_r', vmin=0, vmax=1,
+                       interpolation='nearest')
+        ax.set_xticks(range(pivot.shape[1]))
+        ax.set_xticklabels(pivot.columns, rotation=90, fontsize=6)
+        ax.set_yticks(range(pivot.shape[0]))
+        ax.set_yticklabels(pivot.index, fontsize=6)
+        fig.colorbar(im, ax=ax, label='Sign Flip Rate')
     
     ax.set_title(f'Proxy Fragility Heatmap: {proxy_metric}', fontweight='bold', pad=15)
     ax.set_xlabel(segment_cols[1].capitalize(), fontweight='bold')
@@ -229,7 +268,7 @@ def plot_fragility_heatmap(
     plt.tight_layout()
     
     if save_path:
-        fig.savefig(save_path, bbox_inches='tight', dpi=300)
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
     
     if show:
         plt.show()
@@ -242,7 +281,8 @@ def plot_fragility_heatmap(
 def plot_decision_simulation_results(
     decision_df: pd.DataFrame,
     save_path: Optional[Path] = None,
-    show: bool = True
+    show: bool = True,
+    dpi: int = 300
 ) -> plt.Figure:
     """
     Visualize decision simulation results comparing proxy strategies.
@@ -251,53 +291,56 @@ def plot_decision_simulation_results(
         decision_df: DataFrame from compare_decision_strategies()
         save_path: Optional path to save figure
         show: Whether to display the plot
+        dpi: Resolution of the saved figure (lower saves faster)
 
     Returns:
         matplotlib Figure object
     """
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 
-    # Sort by win rate
+    # Sort by win rate once and share the sorted columns across all panels
     df_sorted = decision_df.sort_values('win_rate', ascending=False)
+    arr = {c: df_sorted[c].to_numpy() for c in [
+        'win_rate', 'avg_regret', 'false_positive_rate', 'false_negative_rate',
+        'correct_ships', 'incorrect_ships', 'missed_opportunities', 'proxy_metric'
+    ]}
+    labels = arr['proxy_metric']
+    y = np.arange(len(labels))
+    label_kw = dict(va='center', fontsize=8)
 
     # 1. Win Rate
     ax = axes[0, 0]
-    bars = ax.barh(range(len(df_sorted)), df_sorted['win_rate'], alpha=0.8, edgecolor='black')
-    colors = plt.cm.RdYlGn(df_sorted['win_rate'])
-    for bar, color in zip(bars, colors):
-        bar.set_color(color)
-    ax.set_yticks(range(len(df_sorted)))
-    ax.set_yticklabels(df_sorted['proxy_metric'], fontsize=9)
+    colors = plt.cm.RdYlGn(arr['win_rate'])
+    ax.barh(y, arr['win_rate'], alpha=0.8, color=colors, edgecolor=colors)
+    ax.set_yticks(y)
+    ax.set_yticklabels(labels, fontsize=9)
     ax.set_xlabel('Win Rate', fontweight='bold')
     ax.set_title('Decision Win Rate by Proxy', fontweight='bold')
     ax.grid(True, alpha=0.3, axis='x')
-    for i, val in enumerate(df_sorted['win_rate']):
-        ax.text(val + 0.01, i, f'{val:.2%}', va='center', fontsize=8)
+    for i, val in enumerate(arr['win_rate']):
+        ax.text(val + 0.01, i, f'{val:.2%}', **label_kw)
 
     # 2. Average Regret
     ax = axes[0, 1]
-    bars = ax.barh(range(len(df_sorted)), df_sorted['avg_regret'], alpha=0.8, edgecolor='black')
-    colors = plt.cm.RdYlGn_r(df_sorted['avg_regret'] / df_sorted['avg_regret'].max())
-    for bar, color in zip(bars, colors):
-        bar.set_color(color)
-    ax.set_yticks(range(len(df_sorted)))
-    ax.set_yticklabels(df_sorted['proxy_metric'], fontsize=9)
+    colors = plt.cm.RdYlGn_r(arr['avg_regret'] / arr['avg_regret'].max())
+    ax.barh(y, arr['avg_regret'], alpha=0.8, color=colors, edgecolor=colors)
+    ax.set_yticks(y)
+    ax.set_yticklabels(labels, fontsize=9)
     ax.set_xlabel('Average Regret', fontweight='bold')
     ax.set_title('Average Decision Regret', fontweight='bold')
     ax.grid(True, alpha=0.3, axis='x')
-    for i, val in enumerate(df_sorted['avg_regret']):
-        ax.text(val + 0.001, i, f'{val:.4f}', va='center', fontsize=8)
+    for i, val in enumerate(arr['avg_regret']):
+        ax.text(val + 0.001, i, f'{val:.4f}', **label_kw)
 
     # 3. False Positive vs False Negative Rate
     ax = axes[1, 0]
-    x = np.arange(len(df_sorted))
     width = 0.35
-    ax.bar(x - width/2, df_sorted['false_positive_rate'], width, label='False Positive',
+    ax.bar(y - width/2, arr['false_positive_rate'], width, label='False Positive',
            alpha=0.8, edgecolor='black')
-    ax.bar(x + width/2, df_sorted['false_negative_rate'], width, label='False Negative',
+    ax.bar(y + width/2, arr['false_negative_rate'], width, label='False Negative',
            alpha=0.8, edgecolor='black')
-    ax.set_xticks(x)
-    ax.set_xticklabels(df_sorted['proxy_metric'], rotation=45, ha='right', fontsize=8)
+    ax.set_xticks(y)
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
     ax.set_ylabel('Rate', fontweight='bold')
     ax.set_title('Error Rates by Proxy', fontweight='bold')
     ax.legend()
@@ -305,16 +348,15 @@ def plot_decision_simulation_results(
 
     # 4. Ship Decisions Breakdown
     ax = axes[1, 1]
-    x = np.arange(len(df_sorted))
     width = 0.25
-    ax.bar(x - width, df_sorted['correct_ships'], width, label='Correct Ships',
+    ax.bar(y - width, arr['correct_ships'], width, label='Correct Ships',
            alpha=0.8, edgecolor='black', color='green')
-    ax.bar(x, df_sorted['incorrect_ships'], width, label='Incorrect Ships',
+    ax.bar(y, arr['incorrect_ships'], width, label='Incorrect Ships',
            alpha=0.8, edgecolor='black', color='red')
-    ax.bar(x + width, df_sorted['missed_opportunities'], width, label='Missed Opportunities',
+    ax.bar(y + width, arr['missed_opportunities'], width, label='Missed Opportunities',
            alpha=0.8, edgecolor='black', color='orange')
-    ax.set_xticks(x)
-    ax.set_xticklabels(df_sorted['proxy_metric'], rotation=45, ha='right', fontsize=8)
+    ax.set_xticks(y)
+    ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
     ax.set_ylabel('Count', fontweight='bold')
     ax.set_title('Ship Decision Breakdown', fontweight='bold')
     ax.legend()
@@ -323,7 +365,7 @@ def plot_decision_simulation_results(
     plt.tight_layout()
 
     if save_path:
-        fig.savefig(save_path, bbox_inches='tight', dpi=300)
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
 
     if show:
         plt.show()
@@ -338,7 +380,9 @@ def plot_all_proxy_correlations(
     proxy_metrics: List[str],
     long_metric: str = "long_retained",
     save_path: Optional[Path] = None,
-    show: bool = True
+    show: bool = True,
+    dpi: int = 300,
+    exp_effects: Optional[pd.DataFrame] = None
 ) -> plt.Figure:
     """
     Grid of correlation plots for all proxy metrics.
@@ -349,11 +393,14 @@ def plot_all_proxy_correlations(
         long_metric: Long-term metric name
         save_path: Optional path to save figure
         show: Whether to display the plot
+        dpi: Resolution of the saved figure (lower saves faster)
+        exp_effects: Optional precomputed experiment-level effects of df
+            (indexed by exp_id, one column per metric)
 
     Returns:
         matplotlib Figure object
     """
-    from proxima.models.baseline import compute_diff_in_means_effect
+    from proxima.models.baseline import _resolve_deltas
 
     n_metrics = len(proxy_metrics)
     n_cols = 2
@@ -362,32 +409,27 @@ def plot_all_proxy_correlations(
     fig, axes = plt.subplots(n_rows, n_cols, figsize=(14, 5 * n_rows))
     axes = axes.flatten() if n_metrics > 1 else [axes]
 
-    long_eff = compute_diff_in_means_effect(df, long_metric)
+    # Effects of the outcome and every proxy (computed once, or reused)
+    metrics = list(dict.fromkeys([long_metric, *proxy_metrics]))
+    effects = _resolve_deltas(df, metrics, exp_effects).add_prefix("delta_")
+    y_all = effects[f"delta_{long_metric}"].to_numpy(dtype=np.float64)
 
     for idx, proxy in enumerate(proxy_metrics):
         ax = axes[idx]
-        proxy_eff = compute_diff_in_means_effect(df, proxy)
-        effects = long_eff.merge(proxy_eff, on="exp_id")
+
+        x = effects[f"delta_{proxy}"].to_numpy(dtype=np.float64)
+        finite = np.isfinite(x) & np.isfinite(y_all)
+        x, y = x[finite], y_all[finite]
 
         # Scatter
-        ax.scatter(
-            effects[f"delta_{proxy}"],
-            effects[f"delta_{long_metric}"],
-            alpha=0.6,
-            s=60,
-            edgecolors='black',
-            linewidths=0.5
-        )
+        _scatter_effects(ax, x, y, size=60)
 
         # Regression line
-        z = np.polyfit(effects[f"delta_{proxy}"], effects[f"delta_{long_metric}"], 1)
-        p = np.poly1d(z)
-        x_line = np.linspace(effects[f"delta_{proxy}"].min(),
-                             effects[f"delta_{proxy}"].max(), 100)
-        ax.plot(x_line, p(x_line), "r--", alpha=0.8, linewidth=2)
+        x_line, y_line = _fit_line(x, y)
+        ax.plot(x_line, y_line, "r--", alpha=0.8, linewidth=2)
 
         # Correlation
-        corr = effects[f"delta_{proxy}"].corr(effects[f"delta_{long_metric}"])
+        corr = np.corrcoef(x, y)[0, 1]
 
         ax.set_xlabel(f'{proxy}', fontweight='bold')
         ax.set_ylabel(f'{long_metric}', fontweight='bold')
@@ -403,7 +445,7 @@ def plot_all_proxy_correlations(
     plt.tight_layout()
 
     if save_path:
-        fig.savefig(save_path, bbox_inches='tight', dpi=300)
+        fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
 
     if show:
         plt.show()
@@ -0,0 +1,30 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+from proxima.generator.simulate import generate_synthetic_experiments
+
+
+@pytest.fixture(scope="session")
+def _session_sample_data():
+    """Generate the shared sample data once per test session."""
+    return generate_synthetic_experiments(n_users=5000, n_experiments=10, seed=42)
+
+
+@pytest.fixture
+def sample_data(_session_sample_data):
+    """Sample data for testing (a fresh copy, so tests may modify it)."""
+    return _session_sample_data.copy()
+
+
+@pytest.fixture(scope="session")
+def small_df():
+    """Generated 1k-user frame shared (read-only) by the generator tests."""
+    return generate_synthetic_experiments(n_users=1000, n_experiments=5, seed=42)
+
+
+@pytest.fixture(scope="session")
+def large_df():
+    """Generated 10k-user frame shared (read-only) by the generator tests."""
+    return generate_synthetic_experiments(n_users=10000, n_experiments=10, seed=42)
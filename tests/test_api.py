@@ -0,0 +1,134 @@
+"""
+Unit tests for the API result cache and endpoints
+"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from proxima.api import main
+
+
+@pytest.fixture
+def bundle(monkeypatch, _session_sample_data):
+    """Install the sample data as the current bundle with an empty cache."""
+    bundle = main.DataBundle(df=_session_sample_data, version=0)
+    monkeypatch.setattr(main, "_bundle", bundle)
+    monkeypatch.setattr(main, "_analysis_cache", {})
+    return bundle
+
+
+class TestMemoize:
+    """Test the shared analysis result cache."""
+
+    def test_cancelled_waiter_does_not_cancel_computation(self, bundle):
+        """Test cancelling one waiter leaves the shared computation running."""
+        calls = []
+
+        async def start():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def scenario():
+            first = asyncio.create_task(main._memoize(bundle, "key", start))
+            second = asyncio.create_task(main._memoize(bundle, "key", start))
+            await asyncio.sleep(0)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            assert await second == "result"
+            # The next request is served from the cache
+            assert await main._memoize(bundle, "key", start) == "result"
+
+        asyncio.run(scenario())
+        assert len(calls) == 1
+
+    def test_cancelled_computation_is_evicted(self, bundle):
+        """Test a cancelled computation is dropped so the next request recomputes."""
+        async def cancelled():
+            raise asyncio.CancelledError
+
+        async def ok():
+            return "result"
+
+        async def scenario():
+            with pytest.raises(asyncio.CancelledError):
+                await main._memoize(bundle, "key", cancelled)
+            assert await main._memoize(bundle, "key", ok) == "result"
+
+        asyncio.run(scenario())
+
+    def test_failed_computation_is_evicted(self, bundle):
+        """Test a failed computation is not cached."""
+        async def fail():
+            raise ValueError("boom")
+
+        async def ok():
+            return "result"
+
+        async def scenario():
+            with pytest.raises(ValueError):
+                await main._memoize(bundle, "key", fail)
+            assert await main._memoize(bundle, "key", ok) == "result"
+
+        asyncio.run(scenario())
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client on a fresh API state with a small generated dataset."""
+    monkeypatch.setattr(main, "_bundle", None)
+    monkeypatch.setattr(main, "_analysis_cache", {})
+    client = TestClient(main.app)
+    response = client.post(
+        "/api/generate-data", json={"n_users": 5000, "n_experiments": 10, "seed": 42}
+    )
+    assert response.status_code == 200
+    return client
+
+
+class TestFullAnalysisEndpoint:
+    """Test /api/full-analysis caching and ETag handling."""
+
+    def test_repeat_request_hits_cache(self, client, monkeypatch):
+        """Test a repeat request is served from the cache without rebuilding."""
+        calls = []
+        build = main._build_full_analysis
+
+        async def counting_build(bundle):
+            calls.append(bundle.version)
+            return await build(bundle)
+
+        monkeypatch.setattr(main, "_build_full_analysis", counting_build)
+        first = client.get("/api/full-analysis")
+        second = client.get("/api/full-analysis")
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert first.headers["ETag"] == second.headers["ETag"]
+        assert len(calls) == 1
+
+    def test_matching_etag_returns_304(self, client):
+        """Test If-None-Match with the current ETag returns 304 and no body."""
+        etag = client.get("/api/full-analysis").headers["ETag"]
+        response = client.get("/api/full-analysis", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    def test_generate_data_invalidates_cache(self, client):
+        """Test regenerating data drops cached results and changes the ETag."""
+        old = client.get("/api/full-analysis")
+        old_version = main._bundle.version
+
+        response = client.post(
+            "/api/generate-data", json={"n_users": 5000, "n_experiments": 10, "seed": 7}
+        )
+        assert response.status_code == 200
+        assert main._bundle.version == old_version + 1
+        assert all(version == main._bundle.version for version, _ in main._analysis_cache)
+
+        new = client.get("/api/full-analysis", headers={"If-None-Match": old.headers["ETag"]})
+        assert new.status_code == 200
+        assert new.headers["ETag"] != old.headers["ETag"]
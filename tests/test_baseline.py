@@ -5,24 +5,20 @@ Unit tests for baseline model and proxy scoring
 import pytest
 import pandas as pd
 import numpy as np
-from proxima.generator.simulate import generate_synthetic_experiments
+from proxima.models import baseline
 from proxima.models.baseline import (
     compute_diff_in_means_effect,
+    compute_overall_effect,
     compute_segment_effects,
     train_long_term_model,
     score_proxies,
     find_top_fragility_segments,
     ProxyScore,
-    EARLY_METRICS
+    EARLY_METRICS,
+    _segment_deltas
 )
 
 
-@pytest.fixture
-def sample_data():
-    """Generate sample data for testing."""
-    return generate_synthetic_experiments(n_users=5000, n_experiments=10, seed=42)
-
-
 class TestComputeDiffInMeansEffect:
     """Test treatment effect computation."""
     
@@ -43,6 +39,32 @@ class TestComputeDiffInMeansEffect:
         assert len(result) > 0
 
 
+@pytest.fixture(params=[True, False], ids=["numba", "pandas"])
+def effect_path(request, monkeypatch):
+    """Run a test on the Numba kernels and again on the pandas fallbacks."""
+    if request.param and not baseline.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(baseline, "NUMBA_AVAILABLE", request.param)
+    return request.param
+
+
+class TestComputeOverallEffect:
+    """Test pooled treatment effect computation."""
+    
+    def test_matches_masked_means(self, sample_data, effect_path):
+        """Test pooled effects match boolean-masked pandas means."""
+        cols = ["long_retained", "early_ctr", "early_watch_min"]
+        result = compute_overall_effect(sample_data, cols)
+        
+        # Reference means in float64 (the effects accumulate in float64)
+        ref = sample_data.astype({col: np.float64 for col in cols})
+        treat = ref[ref["treatment"] == 1]
+        control = ref[ref["treatment"] == 0]
+        for col in cols:
+            expected = treat[col].mean() - control[col].mean()
+            assert result.loc[col, "effect"] == pytest.approx(expected, abs=1e-9)
+
+
 class TestComputeSegmentEffects:
     """Test segment-level effect computation."""
     
@@ -65,21 +87,46 @@ class TestComputeSegmentEffects:
         assert "device" in result.columns
         assert len(result) > 0
 
+    def test_multi_metric_deltas_match(self, sample_data):
+        """Test multi-metric segment deltas match per-metric segment effects."""
+        segment_cols = ["region", "device"]
+        metrics = ["long_retained", "early_ctr"]
+        # Rows with a missing segment key are dropped, as in groupby
+        with_missing = sample_data.copy()
+        with_missing.loc[::50, "device"] = np.nan
+        str_data = sample_data.astype({c: str for c in segment_cols})
+
+        for data in (sample_data, with_missing, str_data):
+            deltas = _segment_deltas(data, metrics, segment_cols)
+            for m in metrics:
+                expected = compute_segment_effects(data, m, segment_cols)
+                merged = expected.merge(deltas, on=["exp_id", *segment_cols], suffixes=("", "_multi"))
+                assert len(merged) == len(expected) == len(deltas)
+                np.testing.assert_allclose(
+                    merged[f"delta_{m}_multi"], merged[f"delta_{m}"], atol=1e-6
+                )
+
+
+@pytest.fixture(scope="module")
+def trained_model(_session_sample_data):
+    """Long-term model fit once on the sample data and shared by the tests below."""
+    return train_long_term_model(_session_sample_data)
+
 
 class TestTrainLongTermModel:
     """Test long-term model training."""
     
-    def test_model_training(self, sample_data):
+    def test_model_training(self, trained_model):
         """Test model can be trained."""
-        model, auc = train_long_term_model(sample_data)
+        model, auc = trained_model
         
         assert model is not None
         assert isinstance(auc, float)
         assert 0.0 <= auc <= 1.0
     
-    def test_model_prediction(self, sample_data):
+    def test_model_prediction(self, sample_data, trained_model):
         """Test model can make predictions."""
-        model, _ = train_long_term_model(sample_data)
+        model, _ = trained_model
         
         # Test prediction on a small sample
         test_sample = sample_data.head(10)[
@@ -149,6 +196,64 @@ class TestScoreProxies:
         reliabilities = details["reliability"].tolist()
         assert reliabilities == sorted(reliabilities, reverse=True)
     
+    def test_effect_corr_matches_diff_in_means(self, sample_data, effect_path):
+        """Test effect correlation agrees with per-metric diff-in-means effects."""
+        details, _ = score_proxies(sample_data)
+        details = details.set_index("metric")
+        ref = sample_data.astype({col: np.float64 for col in ["long_retained", *EARLY_METRICS]})
+        long_eff = compute_diff_in_means_effect(ref, "long_retained").set_index("exp_id")
+
+        for m in EARLY_METRICS:
+            m_eff = compute_diff_in_means_effect(ref, m).set_index("exp_id")
+            expected = m_eff[f"delta_{m}"].corr(long_eff["delta_long_retained"])
+            assert details.loc[m, "effect_corr"] == pytest.approx(expected, abs=1e-9)
+
+    def test_categorical_segments_match_strings(self, sample_data):
+        """Test Categorical segment columns score the same as strings."""
+        details, _ = score_proxies(sample_data)
+        str_data = sample_data.astype({c: str for c in ["region", "device", "tenure"]})
+        str_details, _ = score_proxies(str_data)
+
+        pd.testing.assert_frame_equal(details, str_details)
+
+    def test_float32_metrics_match_float64(self, sample_data):
+        """Test float32 metric storage does not move reported scores (4 decimals)."""
+        rng = np.random.default_rng(0)
+        data64 = sample_data.astype({m: np.float64 for m in EARLY_METRICS})
+        for m in EARLY_METRICS:
+            data64[m] += rng.normal(0.0, 1e-3, size=len(data64))
+        data32 = data64.astype({m: np.float32 for m in EARLY_METRICS})
+
+        details64, _ = score_proxies(data64)
+        details32, _ = score_proxies(data32)
+
+        pd.testing.assert_frame_equal(details64, details32, check_exact=False, atol=1e-4)
+
+    @pytest.mark.skipif(not baseline.NUMBA_WARMUP, reason="kernels not warmed at import")
+    def test_no_compilation_after_warmup(self, sample_data):
+        """Test scoring reuses the import-time kernel signatures."""
+        kernels = [baseline._exp_deltas_kernel, baseline._arm_means_kernel]
+        before = [len(k.signatures) for k in kernels]
+
+        score_proxies(sample_data)
+        score_proxies(sample_data.astype({m: np.float64 for m in EARLY_METRICS}))
+        compute_overall_effect(sample_data, ["long_retained", *EARLY_METRICS])
+
+        assert [len(k.signatures) for k in kernels] == before
+
+    def test_precomputed_effects(self, sample_data):
+        """Test passing precomputed experiment effects gives the same scores."""
+        metrics = ["long_retained", *EARLY_METRICS]
+        effects = pd.concat(
+            [compute_diff_in_means_effect(sample_data, m).set_index("exp_id")[f"delta_{m}"].rename(m)
+             for m in metrics],
+            axis=1,
+        )
+        details, _ = score_proxies(sample_data)
+        reused, _ = score_proxies(sample_data, exp_effects=effects)
+
+        pd.testing.assert_frame_equal(details, reused, check_exact=False, atol=1e-4)
+
     def test_proxy_score_objects(self, sample_data):
         """Test ProxyScore objects are created correctly."""
         _, proxy_scores = score_proxies(sample_data)
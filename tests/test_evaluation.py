@@ -5,25 +5,28 @@ Unit tests for evaluation metrics and decision simulation
 import pytest
 import pandas as pd
 import numpy as np
-from proxima.generator.simulate import generate_synthetic_experiments
 from proxima.evaluation.metrics import (
     compute_effect_with_ci,
     bootstrap_effect_ci,
     compute_experiment_effects_with_ci,
+    compute_proxy_correlation_with_ci,
     TreatmentEffectResult
 )
 from proxima.evaluation.decision_sim import (
     simulate_shipping_decisions,
     compare_decision_strategies,
+    compute_regret_by_segment,
     DecisionSimulationResult
 )
-from proxima.models.baseline import EARLY_METRICS
-
-
-@pytest.fixture
-def sample_data():
-    """Generate sample data for testing."""
-    return generate_synthetic_experiments(n_users=5000, n_experiments=10, seed=42)
+from proxima.evaluation.statistical_tests import (
+    compute_treatment_effect_significance,
+    compute_proxy_reliability_confidence
+)
+from proxima.evaluation import statistical_tests
+from proxima.models.baseline import (
+    EARLY_METRICS, compute_segment_effects, score_proxies, _experiment_deltas
+)
+from scipy import stats
 
 
 class TestComputeEffectWithCI:
@@ -76,6 +79,32 @@ class TestBootstrapEffectCI:
         )
         
         assert result1 == result2
+    
+    def test_close_to_welch_ci(self, sample_data):
+        """Test bootstrap CI agrees with the analytic Welch CI."""
+        _, ci_lower, ci_upper = bootstrap_effect_ci(
+            sample_data, "early_watch_min", n_bootstrap=2000, seed=0
+        )
+        welch = compute_effect_with_ci(sample_data, "early_watch_min")
+        
+        half_width = (welch.ci_upper - welch.ci_lower) / 2
+        assert ci_lower == pytest.approx(welch.ci_lower, abs=0.15 * half_width)
+        assert ci_upper == pytest.approx(welch.ci_upper, abs=0.15 * half_width)
+
+    def test_empty_arm_is_nan(self, sample_data):
+        """Test an empty control arm gives NaN instead of raising."""
+        treated = sample_data[sample_data["treatment"] == 1]
+        result = bootstrap_effect_ci(treated, "early_watch_min", n_bootstrap=50)
+        
+        assert np.isnan(result).all()
+
+    def test_unseeded(self, sample_data):
+        """Test seed=None draws fresh entropy and still returns a valid CI."""
+        effect, ci_lower, ci_upper = bootstrap_effect_ci(
+            sample_data, "early_watch_min", n_bootstrap=100, seed=None
+        )
+        
+        assert ci_lower <= effect <= ci_upper
 
 
 class TestComputeExperimentEffectsWithCI:
@@ -97,6 +126,36 @@ class TestComputeExperimentEffectsWithCI:
         result = compute_experiment_effects_with_ci(sample_data, "long_retained")
         
         assert len(result) == sample_data["exp_id"].nunique()
+    
+    def test_matches_single_experiment_ci(self, sample_data):
+        """Test each row matches compute_effect_with_ci on that experiment."""
+        result = compute_experiment_effects_with_ci(sample_data, "early_watch_min")
+        
+        for row in result.itertuples():
+            single = compute_effect_with_ci(
+                sample_data[sample_data["exp_id"] == row.exp_id], "early_watch_min"
+            )
+            assert row.effect == pytest.approx(single.effect)
+            assert row.ci_lower == pytest.approx(single.ci_lower)
+            assert row.ci_upper == pytest.approx(single.ci_upper)
+            assert row.p_value == pytest.approx(single.p_value)
+            assert row.n_control == single.n_control
+
+
+class TestComputeProxyCorrelationWithCI:
+    """Test proxy correlation with bootstrap CI."""
+    
+    def test_ci_brackets_correlation(self, sample_data):
+        """Test the bootstrap CI is ordered and reproducible."""
+        result = compute_proxy_correlation_with_ci(
+            sample_data, "early_watch_min", n_bootstrap=200, seed=1
+        )
+        
+        assert -1 <= result["ci_lower"] <= result["ci_upper"] <= 1
+        assert result["n_experiments"] == sample_data["exp_id"].nunique()
+        assert result == compute_proxy_correlation_with_ci(
+            sample_data, "early_watch_min", n_bootstrap=200, seed=1
+        )
 
 
 class TestSimulateShippingDecisions:
@@ -164,6 +223,107 @@ class TestCompareDecisionStrategies:
             assert metric in result["proxy_metric"].values
 
 
+class TestComputeRegretBySegment:
+    """Test segment-level decision regret."""
+    
+    def test_matches_per_metric_segment_effects(self, sample_data):
+        """Test error rates agree with separately computed segment effects."""
+        segment_cols = ["region", "device"]
+        result = compute_regret_by_segment(sample_data, "early_ctr", segment_cols)
+        
+        seg = compute_segment_effects(sample_data, "long_retained", segment_cols).merge(
+            compute_segment_effects(sample_data, "early_ctr", segment_cols),
+            on=["exp_id", *segment_cols]
+        )
+        wrong = (seg["delta_early_ctr"] > 0) != (seg["delta_long_retained"] > 0)
+        expected = wrong.groupby([seg[c] for c in segment_cols], observed=True).mean()
+        
+        actual = result.set_index(segment_cols)["error_rate"]
+        pd.testing.assert_series_equal(
+            actual.sort_index(), expected.sort_index(), check_names=False
+        )
+
+
+class TestComputeTreatmentEffectSignificance:
+    """Test per-experiment significance tests."""
+    
+    def test_matches_scipy_welch(self, sample_data):
+        """Test t statistics and p-values match scipy's Welch t-test."""
+        result = compute_treatment_effect_significance(sample_data, "early_watch_min")
+        
+        assert len(result) == sample_data["exp_id"].nunique()
+        ref = sample_data.astype({"early_watch_min": np.float64})
+        for row in result.itertuples():
+            exp = ref[ref["exp_id"] == row.exp_id]
+            t_stat, p_value = stats.ttest_ind(
+                exp.loc[exp["treatment"] == 1, "early_watch_min"],
+                exp.loc[exp["treatment"] == 0, "early_watch_min"],
+                equal_var=False,
+            )
+            assert row.t_statistic == pytest.approx(t_stat)
+            assert row.p_value == pytest.approx(p_value)
+
+
+class TestComputeProxyReliabilityConfidence:
+    """Test experiment-level bootstrap of reliability scores."""
+    
+    def test_reproducible_interval(self, sample_data):
+        """Test the interval is ordered and reproducible for a fixed seed."""
+        score, (lo, hi) = compute_proxy_reliability_confidence(
+            sample_data, "early_watch_min", n_bootstrap=20, seed=1
+        )
+        _, again = compute_proxy_reliability_confidence(
+            sample_data, "early_watch_min", n_bootstrap=20, seed=1
+        )
+        
+        assert 0 <= lo <= hi <= 1
+        assert 0 <= score <= 1
+        assert again == (lo, hi)
+    
+    def test_independent_of_n_jobs(self, sample_data):
+        """Test parallel bootstrap gives the same interval as a serial one."""
+        serial = compute_proxy_reliability_confidence(
+            sample_data, "early_ctr", n_bootstrap=10, n_jobs=1
+        )
+        parallel = compute_proxy_reliability_confidence(
+            sample_data, "early_ctr", n_bootstrap=10, n_jobs=2
+        )
+        
+        assert serial == parallel
+    
+    def test_matches_row_level_resample(self, sample_data):
+        """Test a replicate equals scoring the resampled rows directly."""
+        _, (lo, hi) = compute_proxy_reliability_confidence(
+            sample_data, "early_ctr", n_bootstrap=1, seed=3, n_jobs=1
+        )
+        
+        rng = np.random.default_rng(np.random.SeedSequence(3).spawn(1)[0])
+        exp_ids = sample_data["exp_id"].unique()
+        sampled = rng.choice(exp_ids, size=len(exp_ids), replace=True)
+        resampled = pd.concat([sample_data[sample_data["exp_id"] == e] for e in sampled])
+        details, _ = score_proxies(resampled)
+        expected = details.set_index("metric").loc["early_ctr", "reliability"]
+        
+        assert lo == hi == pytest.approx(expected, abs=1e-9)
+
+
+class TestProxySuperiority:
+    """Test McNemar comparison of two proxies."""
+    
+    def test_precomputed_effects(self, sample_data):
+        """Test passing precomputed experiment effects gives the same result."""
+        effects = _experiment_deltas(sample_data, ["long_retained", *EARLY_METRICS])
+        result = statistical_tests.test_proxy_superiority(
+            sample_data, "early_watch_min", "early_ctr"
+        )
+        reused = statistical_tests.test_proxy_superiority(
+            sample_data, "early_watch_min", "early_ctr", exp_effects=effects
+        )
+        
+        assert 0 <= result["p_value"] <= 1
+        assert result == reused
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 